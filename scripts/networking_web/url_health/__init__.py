@@ -0,0 +1,6 @@
+"""
+Building blocks for web_url_health_checker.py.
+
+Each module covers one concern of the checker (connection pooling,
+scheduling, statistics, output, ...) so the main script stays readable.
+"""
@@ -0,0 +1,110 @@
+"""
+Per-host retry backoff and circuit breaking.
+"""
+
+import random
+import threading
+import time
+from typing import Callable
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 10.0) -> float:
+    """
+    Return a "full jitter" backoff delay for a retry.
+
+    The delay is uniform in [0, min(cap, base * 2**attempt)], so retries of
+    many URLs on one host spread out instead of arriving in waves.
+
+    Args:
+        attempt (int): Number of the failed attempt, starting at 0
+        base (float): Upper bound of the first delay in seconds
+        cap (float): Largest upper bound in seconds
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class _HostState:
+    __slots__ = ('state', 'failures', 'opened_at', 'probing')
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+
+class CircuitBreaker:
+    """
+    Fail fast for hosts that keep failing.
+
+    A host's circuit opens after `failure_threshold` consecutive failures;
+    while open, allow() refuses requests so they fail immediately instead of
+    each waiting out a timeout. After `reset_timeout` seconds the circuit is
+    half-open: a single probe request is let through, and its outcome closes
+    the circuit again or reopens it for another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open a circuit
+            reset_timeout (float): Seconds a circuit stays open before a probe
+            clock (Callable): Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self.trips = 0
+        self.rejected = 0
+
+    def allow(self, host: str) -> bool:
+        """
+        Return True if a request to `host` may be sent now.
+
+        A caller that gets True for a half-open host is the probe and must
+        report its outcome with record().
+        """
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None or entry.state == CLOSED:
+                return True
+            if entry.state == OPEN and self.clock() - entry.opened_at >= self.reset_timeout:
+                entry.state = HALF_OPEN
+            if entry.state == HALF_OPEN and not entry.probing:
+                entry.probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, host: str, success: bool):
+        """Report the outcome of a request that allow() let through."""
+        with self._lock:
+            if success:
+                # Healthy hosts need no state, so memory tracks failing hosts only
+                self._hosts.pop(host, None)
+                return
+            entry = self._hosts.get(host)
+            if entry is None:
+                entry = self._hosts[host] = _HostState()
+            entry.failures += 1
+            if entry.state == HALF_OPEN or entry.failures >= self.failure_threshold:
+                if entry.state != OPEN:
+                    self.trips += 1
+                entry.state, entry.opened_at, entry.probing = OPEN, self.clock(), False
+
+    def stats(self) -> dict:
+        """
+        Return breaker statistics.
+
+        Returns:
+            dict: trips (circuits opened) and rejected (requests failed fast)
+        """
+        with self._lock:
+            return {'trips': self.trips, 'rejected': self.rejected}
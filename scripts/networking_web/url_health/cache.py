@@ -0,0 +1,101 @@
+"""
+Persistent ETag / Last-Modified store for conditional health checks.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+
+class ValidatorCache:
+    """
+    Remember each URL's ETag and Last-Modified validators between runs.
+
+    Checks send them back as If-None-Match / If-Modified-Since, so a server
+    whose page has not changed answers 304 Not Modified without a body.
+    The cache is a JSON file mapping URL -> {"etag": ..., "last_modified": ...}.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path (str, optional): JSON file to load from and save to; None
+                keeps the cache in memory only
+        """
+        self.path = path
+        self.entries = {}
+        self.updated = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable cache file '{path}': {e}")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def headers_for(self, url: str) -> Dict[str, str]:
+        """
+        Return the conditional request headers for a URL (empty if unknown).
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, url: str, response):
+        """
+        Store the validators of a full (non-304) response for a URL.
+
+        Args:
+            url (str): The URL as requested
+            response: A requests.Response
+        """
+        if response.status_code == 304:
+            return
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self._lock:
+            if etag or last_modified:
+                entry = {'etag': etag, 'last_modified': last_modified}
+                if self.entries.get(url) != entry:
+                    self.entries[url] = self.updated[url] = entry
+            elif url in self.entries:
+                # The page stopped sending validators; stop sending ours
+                del self.entries[url]
+                self.updated[url] = None
+
+    def merge(self, updates: Dict):
+        """
+        Apply updates collected by another cache, e.g. in a worker process.
+
+        Args:
+            updates (Dict): URL -> entry, or None for a removed entry
+        """
+        with self._lock:
+            for url, entry in updates.items():
+                if entry is None:
+                    self.entries.pop(url, None)
+                else:
+                    self.entries[url] = entry
+                self.updated[url] = entry
+
+    def save(self):
+        """Write the cache to its file atomically, if anything changed."""
+        if not self.path or not self.updated:
+            return
+        with self._lock:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+            self.updated = {}
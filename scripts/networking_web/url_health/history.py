@@ -0,0 +1,359 @@
+"""
+Compact binary history of URL health: state transitions plus periodic
+latency rollups, instead of one row per check.
+"""
+
+import math
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+DOWN, UP = 0, 1
+UNKNOWN = 255
+
+
+class _RecordFile:
+    """
+    An append-only file of fixed-size binary records, addressed by row number.
+
+    Every record ends with the row number of the previous record for the
+    same URL (-1 for none), so one URL's rows can be walked newest first
+    without reading anyone else's.
+    """
+
+    def __init__(self, path: str, fmt: str):
+        """
+        Args:
+            path (str): Record file
+            fmt (str): struct format of one record; its last field is the
+                previous row of the same URL
+        """
+        self.path = path
+        self.record = struct.Struct(fmt)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        # A crash mid-flush can leave a partial record; drop it
+        self.rows = size // self.record.size
+        if size % self.record.size:
+            os.truncate(path, self.rows * self.record.size)
+        self._pending = bytearray()
+
+    def append(self, *fields) -> int:
+        """Buffer one record and return its row number."""
+        self._pending += self.record.pack(*fields)
+        self.rows += 1
+        return self.rows - 1
+
+    def flush(self):
+        """Append buffered records to the file."""
+        if self._pending:
+            with open(self.path, 'ab') as f:
+                f.write(self._pending)
+            self._pending = bytearray()
+
+    def walk(self, head: int) -> Iterator[tuple]:
+        """Yield a URL's flushed records newest first, starting at row `head`."""
+        if head < 0:
+            return
+        with open(self.path, 'rb') as f:
+            while head >= 0:
+                f.seek(head * self.record.size)
+                fields = self.record.unpack(f.read(self.record.size))
+                yield fields
+                head = fields[-1]
+
+
+class StateStore:
+    """
+    Keep the last known state of every URL and record only what changes.
+
+    Stored in `directory`:
+        urls.txt          one URL per line; the line number is its id
+        transitions.dat   url, time, status: one record per UP/DOWN change
+        rollups.dat       url, start, first, last, checks, up, timed,
+                          latency_sum, latency_min, latency_max: one record
+                          per URL per `rollup_seconds` period
+        heads.dat         per URL id: newest transition and rollup row and
+                          the last state
+
+    Repeated identical checks only update in-memory rollup counters, so the
+    store grows with the number of outages and periods rather than checks.
+    Each record points to the previous record of the same URL, and
+    heads.dat points to the newest, so opening the store reads only the URL
+    list and heads, and uptime() and rollups() read only the records of the
+    URL asked about within the window. New records are appended to disk
+    every `flush_seconds` and on close().
+    """
+
+    TRANSITION = '<Idbq'
+    ROLLUP = '<IdddIIIdffq'
+    HEAD = struct.Struct('<qqB')
+
+    def __init__(self, directory: str, rollup_seconds: float = 3600.0,
+                 flush_seconds: float = 60.0, clock=time.time):
+        """
+        Args:
+            directory (str): Store directory, created if missing
+            rollup_seconds (float): Length of a latency rollup period; a
+                silence longer than this between checks is not counted as
+                observed time
+            flush_seconds (float): Longest time new rows stay only in memory
+            clock (Callable): Wall clock used to timestamp checks
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.rollup_seconds = rollup_seconds
+        self.flush_seconds = flush_seconds
+        self.clock = clock
+        self._last_flush = clock()
+        self._lock = threading.Lock()
+
+        self._urls_path = os.path.join(directory, 'urls.txt')
+        self.urls = []
+        if os.path.exists(self._urls_path):
+            with open(self._urls_path, 'r', encoding='utf-8') as f:
+                self.urls = [line.rstrip('\n') for line in f]
+        self.ids = {url: i for i, url in enumerate(self.urls)}
+        self._new_urls = []
+
+        self.transitions = _RecordFile(os.path.join(directory, 'transitions.dat'), self.TRANSITION)
+        self.rollup_table = _RecordFile(os.path.join(directory, 'rollups.dat'), self.ROLLUP)
+
+        # url id -> [transition head, rollup head, state]
+        self._heads_path = os.path.join(directory, 'heads.dat')
+        self._heads = []
+        if os.path.exists(self._heads_path):
+            with open(self._heads_path, 'rb') as f:
+                data = f.read()
+            self._heads = [list(h) for h in self.HEAD.iter_unpack(
+                data[:len(data) - len(data) % self.HEAD.size])]
+        # URLs whose heads were not written before a crash start afresh
+        del self._heads[len(self.urls):]
+        self._heads += [[-1, -1, UNKNOWN] for _ in range(len(self.urls) - len(self._heads))]
+        self._heads_dirty = False
+
+        # url id -> [start, first, last, checks, up, timed, latency_sum, latency_min, latency_max]
+        self._open_rollups = {}
+        self.checks_recorded = 0
+        self.transitions_recorded = 0
+
+    def _url_id(self, url: str) -> int:
+        url_id = self.ids.get(url)
+        if url_id is None:
+            url_id = self.ids[url] = len(self.urls)
+            self.urls.append(url)
+            self._new_urls.append(url)
+            self._heads.append([-1, -1, UNKNOWN])
+        return url_id
+
+    def record(self, result: Dict, when: Optional[float] = None) -> bool:
+        """
+        Record one check result.
+
+        Args:
+            result (Dict): A result dictionary from check_url()
+            when (float, optional): Unix time of the check (default: now)
+
+        Returns:
+            bool: True if the URL's state changed (or it is new)
+        """
+        when = self.clock() if when is None else when
+        status = UP if result['status'] == 'UP' else DOWN
+        latency = result['response_time']
+        with self._lock:
+            url_id = self._url_id(result['url'])
+            head = self._heads[url_id]
+            self.checks_recorded += 1
+            changed = head[2] != status
+            if changed:
+                head[0] = self.transitions.append(url_id, when, status, head[0])
+                head[2] = status
+                self._heads_dirty = True
+                self.transitions_recorded += 1
+
+            start = math.floor(when / self.rollup_seconds) * self.rollup_seconds
+            rollup = self._open_rollups.get(url_id)
+            if rollup is not None and rollup[0] != start:
+                self._close_rollup(url_id, rollup)
+                rollup = None
+            if rollup is None:
+                rollup = self._open_rollups[url_id] = [start, when, when, 0, 0, 0, 0.0, math.inf, 0.0]
+            rollup[2] = when
+            rollup[3] += 1
+            rollup[4] += status
+            if latency:
+                rollup[5] += 1
+                rollup[6] += latency
+                rollup[7] = min(rollup[7], latency)
+                rollup[8] = max(rollup[8], latency)
+            if when - self._last_flush >= self.flush_seconds:
+                self._flush_locked(close_periods=False)
+        return changed
+
+    def _close_rollup(self, url_id: int, rollup: List):
+        start, first, last, checks, up, timed, total, low, high = rollup
+        head = self._heads[url_id]
+        head[1] = self.rollup_table.append(url_id, start, first, last, checks, up, timed, total,
+                                           low if timed else 0.0, high, head[1])
+        self._heads_dirty = True
+
+    def flush(self, close_periods: bool = False):
+        """
+        Write new URLs, transitions and finished rollups to disk.
+
+        Args:
+            close_periods (bool): Also write rollups for periods still in
+                progress, e.g. when the run ends
+        """
+        with self._lock:
+            self._flush_locked(close_periods)
+
+    def _flush_locked(self, close_periods: bool):
+        if close_periods:
+            for url_id, rollup in self._open_rollups.items():
+                self._close_rollup(url_id, rollup)
+            self._open_rollups = {}
+        # URLs and records before the heads that point at them, so a crash
+        # at any point leaves a readable store
+        if self._new_urls:
+            with open(self._urls_path, 'a', encoding='utf-8') as f:
+                f.write(''.join(url + '\n' for url in self._new_urls))
+            self._new_urls = []
+        self.transitions.flush()
+        self.rollup_table.flush()
+        if self._heads_dirty:
+            tmp = self._heads_path + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(b''.join(self.HEAD.pack(*head) for head in self._heads))
+            os.replace(tmp, self._heads_path)
+            self._heads_dirty = False
+        self._last_flush = self.clock()
+
+    def close(self):
+        """Flush everything, including rollups of the current period."""
+        self.flush(close_periods=True)
+
+    def _url_rollups(self, url_id: int, since: float) -> List[tuple]:
+        """
+        Return (start, first, last, checks, up, timed, latency_sum,
+        latency_min, latency_max) for a URL's rollups that end at or after
+        `since`, oldest first, including the period in progress.
+        """
+        rows = []
+        for fields in self.rollup_table.walk(self._heads[url_id][1]):
+            if fields[3] < since:
+                break
+            rows.append(fields[1:-1])
+        rows.reverse()
+        rollup = self._open_rollups.get(url_id)
+        if rollup is not None and rollup[2] >= since:
+            start, first, last, checks, up, timed, total, low, high = rollup
+            rows.append((start, first, last, checks, up, timed, total,
+                         low if timed else 0.0, high))
+        return rows
+
+    def _query(self, url: str):
+        """Flush pending records and return the URL's id, or None if unknown."""
+        self._flush_locked(close_periods=False)
+        return self.ids.get(url)
+
+    def uptime(self, url: str, since: float, until: Optional[float] = None) -> Optional[Dict]:
+        """
+        Return time-weighted uptime of a URL over [since, until].
+
+        Only observed time counts: from a check to the next one, as long as
+        they are at most `rollup_seconds` apart. Time before the first
+        check, after the last check, and silences longer than a rollup
+        period (e.g. while nothing was monitoring) are left out.
+
+        Args:
+            url (str): The URL, as recorded
+            since (float): Window start, Unix time
+            until (float, optional): Window end, Unix time (default: now)
+
+        Returns:
+            Dict: uptime (0-1), observed_seconds, down_seconds and
+            transitions within the window, or None if nothing was observed
+        """
+        until = self.clock() if until is None else until
+        with self._lock:
+            url_id = self._query(url)
+            if url_id is None:
+                return None
+            rollups = self._url_rollups(url_id, since)
+            # Transitions in the window, plus the one in force at `since`
+            events = []
+            for _, when, status, _ in self.transitions.walk(self._heads[url_id][0]):
+                if when <= until:
+                    events.append((when, status))
+                if when < since:
+                    break
+        events.reverse()
+
+        # Observed spans: each rollup's first to last check, joined to the
+        # next rollup unless the silence between them is a gap
+        spans = []
+        for _, first, last, *_ in rollups:
+            if spans and first - spans[-1][1] <= self.rollup_seconds:
+                spans[-1][1] = max(spans[-1][1], last)
+            else:
+                spans.append([first, last])
+
+        up = down = 0.0
+        for first, last in spans:
+            first, last = max(first, since), min(last, until)
+            for i, (when, status) in enumerate(events):
+                stop = events[i + 1][0] if i + 1 < len(events) else math.inf
+                overlap = min(stop, last) - max(when, first)
+                if overlap > 0:
+                    if status == UP:
+                        up += overlap
+                    else:
+                        down += overlap
+        observed = up + down
+        if not observed:
+            return None
+        changes = sum(1 for when, _ in events if since <= when <= until)
+        return {'uptime': up / observed, 'observed_seconds': observed,
+                'down_seconds': down, 'transitions': changes}
+
+    def rollups(self, url: str, since: float, until: Optional[float] = None) -> List[Dict]:
+        """
+        Return a URL's rollup periods that start within [since, until],
+        merging rows that different runs wrote for the same period.
+
+        Returns:
+            List[Dict]: One dict per period with start, checks, up, timed
+            (checks that got a response), latency_sum, mean_latency,
+            min_latency and max_latency (ms; None if no check got a response)
+        """
+        until = self.clock() if until is None else until
+        with self._lock:
+            url_id = self._query(url)
+            if url_id is None:
+                return []
+            rows = self._url_rollups(url_id, since)
+
+        periods = {}
+        for start, _, _, *row in rows:
+            if not since <= start <= until:
+                continue
+            # Runs that stop and restart within one period each write a row
+            row = list(row)
+            merged = periods.get(start)
+            if merged is None:
+                periods[start] = row
+            elif row[2]:
+                if not merged[2]:
+                    merged[4] = row[4]
+                merged[:4] = [a + b for a, b in zip(merged[:4], row[:4])]
+                merged[4], merged[5] = min(merged[4], row[4]), max(merged[5], row[5])
+            else:
+                merged[0] += row[0]
+                merged[1] += row[1]
+        return [{'start': start, 'checks': checks, 'up': up, 'timed': timed, 'latency_sum': total,
+                 'mean_latency': total / timed if timed else None,
+                 'min_latency': low if timed else None,
+                 'max_latency': high if timed else None}
+                for start, (checks, up, timed, total, low, high) in sorted(periods.items())]
@@ -0,0 +1,246 @@
+"""
+Streaming URL list ingestion with memory-bounded deduplication.
+"""
+
+import hashlib
+import math
+import sys
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def iter_url_lines(filename: str) -> Iterator[str]:
+    """
+    Yield URLs from a text file one line at a time, skipping blank lines and
+    # comments. '-' reads standard input. Bytes that are not valid UTF-8
+    are replaced, so one bad line in a crawl export cannot end the run.
+
+    Args:
+        filename (str): Path to the file, or '-'
+
+    Raises:
+        OSError: If the file cannot be opened
+    """
+    if filename == '-':
+        f = open(sys.stdin.fileno(), 'r', encoding='utf-8', errors='replace', closefd=False)
+    else:
+        f = open(filename, 'r', encoding='utf-8', errors='replace')
+    try:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        f.close()
+
+
+def canonical_url(url: str) -> str:
+    """
+    Return the form of a URL used to detect duplicates.
+
+    Adds https:// when there is no scheme, lowercases the scheme and host,
+    drops a default port, the fragment and a trailing bare '/' path, so
+    "Example.com", "https://example.com:443/" and "https://example.com/#top"
+    all compare equal.
+    """
+    url = url.strip()
+    if not url.lower().startswith(('http://', 'https://')):
+        url = 'https://' + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        host = f"[{host}]"
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    if parts.username or parts.password:
+        netloc = parts.netloc.rsplit('@', 1)[0] + '@' + netloc
+    path = '' if parts.path == '/' else parts.path
+    return urlunsplit((scheme, netloc, path, parts.query, ''))
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set: membership tests may return a false
+    positive at about `error_rate` (while at most `capacity` items have been
+    added) but never a false negative. Memory is set up front - about 1.8
+    bytes per item at a 0.1% error rate - however many items are added.
+    """
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001):
+        """
+        Args:
+            capacity (int): Number of items the error rate is sized for
+            error_rate (float): Target false positive probability (0-1)
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @staticmethod
+    def _digest(item: str):
+        """Return the two independent 64-bit hashes used for double hashing."""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def _positions(self, hashes):
+        # Double hashing: k positions from two independent 64-bit hashes
+        h1, h2 = hashes
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, item: str) -> bool:
+        return self._contains(self._digest(item))
+
+    def _contains(self, hashes) -> bool:
+        # Stop at the first clear bit; most absent items need one or two probes
+        h1, h2 = hashes
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            p = (h1 + i * h2) % size
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+        return True
+
+    def add(self, item: str) -> bool:
+        """
+        Add an item.
+
+        Returns:
+            bool: True if the item was (probably) not present before
+        """
+        return self._add(self._digest(item))
+
+    def _add(self, hashes) -> bool:
+        new = False
+        for p in self._positions(hashes):
+            mask = 1 << (p & 7)
+            if not self.bits[p >> 3] & mask:
+                self.bits[p >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that grows instead of degrading when it fills up.
+
+    Items go into the newest BloomFilter slice. When that slice holds its
+    capacity, a new slice `growth` times larger is added, with an error rate
+    `tightening` times smaller. The combined false positive rate stays below
+    `error_rate` however many items arrive, and memory grows with the items
+    actually seen rather than being reserved up front (Almeida et al., 2007).
+    """
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001,
+                 growth: int = 2, tightening: float = 0.5):
+        """
+        Args:
+            capacity (int): Items the first slice is sized for
+            error_rate (float): Bound on the overall false positive rate (0-1)
+            growth (int): Capacity multiplier for each new slice
+            tightening (float): Error rate multiplier for each new slice (0-1)
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        # The slice error rates form a geometric series summing to error_rate
+        self.slices = [BloomFilter(capacity, error_rate * (1 - tightening))]
+        self.count = 0
+
+    def __contains__(self, item: str) -> bool:
+        hashes = BloomFilter._digest(item)
+        return any(s._contains(hashes) for s in self.slices)
+
+    def add(self, item: str) -> bool:
+        """
+        Add an item.
+
+        Returns:
+            bool: True if the item was (probably) not present before
+        """
+        hashes = BloomFilter._digest(item)
+        # Newest slice first: it is the largest and holds the recent items
+        if any(s._contains(hashes) for s in reversed(self.slices)):
+            return False
+        current = self.slices[-1]
+        if current.count >= current.capacity:
+            current = BloomFilter(current.capacity * self.growth,
+                                  current.error_rate * self.tightening)
+            self.slices.append(current)
+        current._add(hashes)
+        self.count += 1
+        return True
+
+
+class ExactSet:
+    """Exact duplicate tracking with a plain set; memory grows with unique items."""
+
+    def __init__(self):
+        self._items = set()
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._items
+
+    def add(self, item: str) -> bool:
+        """Add an item, returning True if it was not present before."""
+        if item in self._items:
+            return False
+        self._items.add(item)
+        return True
+
+
+def dedupe_urls(urls: Iterable[str], method: str = 'exact', capacity: int = 10_000_000,
+                error_rate: float = 0.001,
+                normalize: Optional[Callable[[str], str]] = None,
+                counts: Optional[Dict[str, int]] = None) -> Iterator[str]:
+    """
+    Lazily yield each distinct URL once, in input order.
+
+    Args:
+        urls (Iterable[str]): URLs, e.g. from iter_url_lines()
+        method (str): 'exact' (a set), 'bloom' (a ScalableBloomFilter; a
+            false positive drops a unique URL at most about `error_rate`
+            of the time) or 'none'
+        capacity (int): Unique URLs the first Bloom filter slice is sized for
+        error_rate (float): False positive rate for 'bloom'
+        normalize (Callable, optional): Applied to each yielded URL
+        counts (Dict, optional): Updated with 'unique' and 'duplicates'
+            (URLs skipped) as the input is read
+
+    Yields:
+        str: URLs whose canonical_url() was not seen before
+    """
+    if method == 'none':
+        seen = None
+    elif method == 'bloom':
+        seen = ScalableBloomFilter(capacity, error_rate)
+    elif method == 'exact':
+        seen = ExactSet()
+    else:
+        raise ValueError(f"Unknown dedupe method: {method}")
+
+    if counts is None:
+        counts = {}
+    counts.setdefault('unique', 0)
+    counts.setdefault('duplicates', 0)
+    for url in urls:
+        if seen is None or seen.add(canonical_url(url)):
+            counts['unique'] += 1
+            yield normalize(url) if normalize else url
+        else:
+            counts['duplicates'] += 1
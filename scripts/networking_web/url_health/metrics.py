@@ -0,0 +1,188 @@
+"""
+Prometheus text-format metrics for the health checker, served over HTTP.
+"""
+
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import urlsplit
+
+# Upper bounds in seconds of the response time histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """
+    Health check metrics kept up to date as results arrive.
+
+    observe() costs O(1) per result (a dict update plus a bisect over the
+    fixed bucket list), so scraping never has to walk the results. Exposed:
+
+        url_health_up{url}                        1 if the last check was UP
+        url_health_last_response_seconds{url}     latest response time
+        url_health_last_check_timestamp_seconds{url}
+        url_health_checks_total{host,status}      counter; rate() gives check rates
+        url_health_response_seconds{host}         histogram of response times
+        url_health_checks_in_flight               checks currently running
+    """
+
+    def __init__(self, host_key=None):
+        """
+        Args:
+            host_key (Callable, optional): Function mapping a URL to the
+                host label; defaults to the URL's network location
+        """
+        self.host_key = host_key or (lambda url: urlsplit(url).netloc.lower())
+        self._lock = threading.Lock()
+        self._urls = {}
+        self._checks = {}
+        self._histograms = {}
+        self.in_flight = 0
+        self.started = time.time()
+
+    def check_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def check_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def observe(self, result: Dict):
+        """Update every metric from one check result."""
+        url = result['url']
+        host = self.host_key(url)
+        up = result['status'] == 'UP'
+        seconds = result['response_time'] / 1000 if result['response_time'] else None
+        with self._lock:
+            self._urls[url] = (1 if up else 0, seconds, time.time())
+            key = (host, 'up' if up else 'down')
+            self._checks[key] = self._checks.get(key, 0) + 1
+            if seconds is not None:
+                hist = self._histograms.get(host)
+                if hist is None:
+                    # Per-bucket counts (last one is +Inf), sum, count
+                    hist = self._histograms[host] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+                hist[0][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+                hist[1] += seconds
+                hist[2] += 1
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            urls = dict(self._urls)
+            checks = dict(self._checks)
+            histograms = {host: (list(h[0]), h[1], h[2]) for host, h in self._histograms.items()}
+            in_flight = self.in_flight
+
+        lines = [
+            '# HELP url_health_up Whether the last check of the URL was UP (1) or DOWN (0).',
+            '# TYPE url_health_up gauge',
+        ]
+        lines += [f'url_health_up{{url="{_escape(u)}"}} {v[0]}' for u, v in urls.items()]
+        lines += [
+            '# HELP url_health_last_response_seconds Response time of the last check of the URL.',
+            '# TYPE url_health_last_response_seconds gauge',
+        ]
+        lines += [f'url_health_last_response_seconds{{url="{_escape(u)}"}} {v[1]}'
+                  for u, v in urls.items() if v[1] is not None]
+        lines += [
+            '# HELP url_health_last_check_timestamp_seconds Unix time of the last check of the URL.',
+            '# TYPE url_health_last_check_timestamp_seconds gauge',
+        ]
+        lines += [f'url_health_last_check_timestamp_seconds{{url="{_escape(u)}"}} {v[2]:.3f}'
+                  for u, v in urls.items()]
+        lines += [
+            '# HELP url_health_checks_total Checks completed, by host and result.',
+            '# TYPE url_health_checks_total counter',
+        ]
+        lines += [f'url_health_checks_total{{host="{_escape(h)}",status="{s}"}} {n}'
+                  for (h, s), n in sorted(checks.items())]
+        lines += [
+            '# HELP url_health_response_seconds Response time of checks that got a response.',
+            '# TYPE url_health_response_seconds histogram',
+        ]
+        for host, (buckets, total, count) in sorted(histograms.items()):
+            label = _escape(host)
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+                cumulative += n
+                lines.append(f'url_health_response_seconds_bucket{{host="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'url_health_response_seconds_sum{{host="{label}"}} {total}')
+            lines.append(f'url_health_response_seconds_count{{host="{label}"}} {count}')
+        lines += [
+            '# HELP url_health_checks_in_flight Checks currently running.',
+            '# TYPE url_health_checks_in_flight gauge',
+            f'url_health_checks_in_flight {in_flight}',
+            '# HELP url_health_start_time_seconds Unix time the checker started.',
+            '# TYPE url_health_start_time_seconds gauge',
+            f'url_health_start_time_seconds {self.started:.3f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MetricsServer:
+    """
+    Serve a MetricsRegistry at /metrics from a background thread.
+
+    Example:
+        >>> with MetricsServer(registry, port=9101):
+        ...     checker.monitor(targets)
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = '127.0.0.1', port: int = 9101):
+        """
+        Args:
+            registry (MetricsRegistry): Metrics to expose
+            host (str): Interface to bind (default: 127.0.0.1)
+            port (int): Port to bind, 0 for any free port (default: 9101)
+        """
+        self.httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.registry = registry
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        """Start serving on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,138 @@
+"""
+Incremental result writers: each check is appended as it completes, so a
+crash loses at most one unflushed batch and nothing is held in memory.
+"""
+
+import csv
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict
+
+RESULT_FIELDS = ['url', 'status', 'status_code', 'response_time', 'dns_time',
+                 'connect_time', 'tls_time', 'ttfb_time', 'transfer_time',
+                 'bytes_received', 'attempts', 'timestamp', 'error']
+
+
+class ResultWriter(ABC):
+    """
+    Base class for thread-safe writers that buffer results and write them
+    in batches of `batch_size`, flushing the file after every batch.
+
+    Subclasses implement _write_rows().
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, append: bool = False):
+        """
+        Args:
+            path (str): Output file
+            batch_size (int): Results buffered before each write and flush
+            append (bool): Add to an existing file instead of replacing it
+        """
+        self.path = path
+        self.batch_size = max(batch_size, 1)
+        self.written = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = self._open(append)
+
+    def _open(self, append: bool):
+        return open(self.path, 'a' if append else 'w', newline='', encoding='utf-8')
+
+    def write(self, result: Dict):
+        """Buffer one result, writing the batch out once it is full."""
+        with self._lock:
+            self._buffer.append(result)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        """Write any buffered results and flush them to the OS."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            self._write_rows(self._buffer)
+            self.written += len(self._buffer)
+            self._buffer = []
+        self._file.flush()
+
+    @abstractmethod
+    def _write_rows(self, rows):
+        """Write a batch of result dicts to the open file."""
+
+    def close(self):
+        """Flush and close the file."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush_locked()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JSONLWriter(ResultWriter):
+    """Write one JSON object per line; a partial file is still readable."""
+
+    def _write_rows(self, rows):
+        self._file.write(''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows))
+
+
+class CSVWriter(ResultWriter):
+    """Write results as CSV rows, with a header unless appending to a non-empty file."""
+
+    def _open(self, append: bool):
+        f = super()._open(append)
+        self._writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS, extrasaction='ignore')
+        if f.tell() == 0:
+            self._writer.writeheader()
+        return f
+
+    def _write_rows(self, rows):
+        self._writer.writerows(rows)
+
+
+class HistoryWriter(JSONLWriter):
+    """
+    Append-only JSONL history shared by repeated runs.
+
+    When the file grows past `max_bytes` it is rotated like a log:
+    history.jsonl becomes history.jsonl.1, .1 becomes .2, and so on, keeping
+    at most `backups` old files.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                 batch_size: int = 100):
+        """
+        Args:
+            path (str): History file
+            max_bytes (int): Size at which the file is rotated
+            backups (int): Rotated files to keep (0 truncates instead)
+            batch_size (int): Results buffered before each write and flush
+        """
+        self.max_bytes = max_bytes
+        self.backups = backups
+        super().__init__(path, batch_size, append=True)
+
+    def _flush_locked(self):
+        super()._flush_locked()
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                older = f"{self.path}.{i}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self._file = self._open(append=self.backups > 0)
+
@@ -0,0 +1,170 @@
+"""
+Shared keep-alive sessions with per-host connection pools.
+"""
+
+import socket
+import threading
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from .resolver import DNSCache, system_lookup
+from .timing import record_phase
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that keeps a bounded keep-alive pool per host and counts
+    how many TCP connections it opens versus how many requests it sends.
+
+    With `pool_block` set, a host never gets more than `pool_maxsize`
+    connections; extra requests wait for a free connection instead of
+    opening throwaway ones.
+    """
+
+    def __init__(self, pool_connections: int = 100, pool_maxsize: int = 10,
+                 pool_block: bool = True, dns_cache: Optional[DNSCache] = None):
+        """
+        Args:
+            pool_connections (int): Number of per-host pools to keep open
+            pool_maxsize (int): Maximum connections kept per host
+            pool_block (bool): Wait for a free connection instead of
+                opening more than pool_maxsize per host
+            dns_cache (DNSCache, optional): Cache used to resolve hosts for
+                new connections; None resolves every time
+        """
+        self.dns_cache = dns_cache
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.requests_sent = 0
+        super().__init__(pool_connections=pool_connections,
+                         pool_maxsize=pool_maxsize, pool_block=pool_block)
+
+    def _connection_opened(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def init_poolmanager(self, *args, **kwargs):
+        """Create the pool manager with connection-counting pool classes."""
+        super().init_poolmanager(*args, **kwargs)
+        adapter = self
+
+        def counting(base):
+            # Count socket connects rather than connection objects, since
+            # urllib3 reconnects a pooled object in place after the server
+            # closes it.
+            uses_tls = base.scheme == 'https'
+
+            class CountingConnection(base.ConnectionCls):
+                def connect(self):
+                    adapter._connection_opened()
+                    self._socket_time = 0.0
+                    start = time.perf_counter()
+                    try:
+                        return super().connect()
+                    finally:
+                        if uses_tls:
+                            # Whatever connect() spent beyond DNS + TCP is the TLS handshake
+                            tls = time.perf_counter() - start - self._socket_time
+                            record_phase('tls', max(tls, 0.0))
+
+                def _new_conn(self):
+                    return _timed_new_conn(self, super()._new_conn, adapter.dns_cache)
+
+            class CountingPool(base):
+                ConnectionCls = CountingConnection
+            return CountingPool
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': counting(HTTPConnectionPool),
+            'https': counting(HTTPSConnectionPool),
+        }
+
+    def send(self, request, **kwargs):
+        """Send a request, counting it for reuse statistics."""
+        with self._lock:
+            self.requests_sent += 1
+        return super().send(request, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Return connection reuse statistics.
+
+        Returns:
+            dict: requests, connections_opened and reuse_ratio (0-1)
+        """
+        with self._lock:
+            sent, opened = self.requests_sent, self.connections_opened
+        reused = max(sent - opened, 0)
+        return {
+            'requests': sent,
+            'connections_opened': opened,
+            'reuse_ratio': reused / sent if sent else 0.0,
+        }
+
+
+def _timed_new_conn(conn, new_conn, dns_cache: Optional[DNSCache] = None):
+    """
+    Open a socket for a urllib3 connection, timing DNS and TCP separately.
+
+    The host is resolved up front (through `dns_cache` when given), then
+    urllib3's own _new_conn() is pointed at each address in turn so its
+    error handling and socket options still apply. If resolution fails,
+    urllib3 is left to raise its usual error.
+    """
+    host = conn._dns_host
+    start = time.perf_counter()
+    try:
+        if dns_cache is not None:
+            addresses = dns_cache.resolve(host)
+        else:
+            addresses = system_lookup(host)[0]
+    except (socket.gaierror, UnicodeError):
+        addresses = []
+    resolved = time.perf_counter()
+    record_phase('dns', resolved - start)
+
+    try:
+        if not addresses:
+            return new_conn()
+        error = None
+        for address in addresses:
+            conn._dns_host = address
+            try:
+                return new_conn()
+            except (NewConnectionError, ConnectTimeoutError) as e:
+                error = e
+        raise error
+    finally:
+        conn._dns_host = host
+        elapsed = time.perf_counter() - resolved
+        record_phase('connect', elapsed)
+        conn._socket_time = resolved - start + elapsed
+
+
+def create_session(pool_connections: int = 100, pool_maxsize: int = 10,
+                   pool_block: bool = True,
+                   dns_cache: Optional[DNSCache] = None) -> requests.Session:
+    """
+    Create a requests.Session that reuses connections across checks.
+
+    Args:
+        pool_connections (int): Number of per-host pools to keep open
+        pool_maxsize (int): Maximum connections kept per host
+        pool_block (bool): Cap connections per host at pool_maxsize
+        dns_cache (DNSCache, optional): Resolver cache for new connections
+
+    Returns:
+        requests.Session: Session with a PooledAdapter mounted for http and
+        https; the adapter is also available as `session.pool_adapter`
+    """
+    session = requests.Session()
+    adapter = PooledAdapter(pool_connections, pool_maxsize, pool_block, dns_cache)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.pool_adapter = adapter
+    return session
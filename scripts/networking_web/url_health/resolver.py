@@ -0,0 +1,184 @@
+"""
+In-process DNS cache shared by every connection of a health checker.
+"""
+
+import functools
+import ipaddress
+import socket
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import dns.resolver  # dnspython, optional: gives real record TTLs
+except ImportError:
+    dns = None
+
+HOSTS_FILE = '/etc/hosts'
+
+
+def system_lookup(host: str) -> Tuple[List[str], Optional[float]]:
+    """
+    Resolve a host with the system resolver.
+
+    Returns:
+        Tuple: (unique addresses in resolver order, None since getaddrinfo
+        does not report a TTL)
+
+    Raises:
+        socket.gaierror: If the host cannot be resolved
+    """
+    infos = socket.getaddrinfo(host, None, 0, socket.SOCK_STREAM)
+    return list(dict.fromkeys(info[4][0] for info in infos)), None
+
+
+@functools.lru_cache(maxsize=1)
+def hosts_file_names(path: str = HOSTS_FILE) -> frozenset:
+    """Return the lowercased host names listed in a hosts file (empty if unreadable)."""
+    names = set()
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                names.update(name.lower() for name in line.split('#', 1)[0].split()[1:])
+    except OSError:
+        pass
+    return frozenset(names)
+
+
+def record_lookup(host: str) -> Tuple[List[str], Optional[float]]:
+    """
+    Resolve a host's A and AAAA records with dnspython to learn their TTL.
+
+    Names listed in /etc/hosts, and anything dnspython cannot answer
+    (search domains, other NSS sources), go to the system resolver so the
+    answer matches what getaddrinfo would connect to.
+    """
+    if host.lower().rstrip('.') in hosts_file_names():
+        return system_lookup(host)
+    addresses, ttls = [], []
+    for rdtype in ('A', 'AAAA'):
+        try:
+            answer = dns.resolver.resolve(host, rdtype)
+        except Exception:
+            continue
+        addresses += [record.address for record in answer]
+        ttls.append(float(answer.rrset.ttl))
+    if not addresses:
+        return system_lookup(host)
+    return addresses, min(ttls)
+
+
+class _PendingLookup:
+    """The outcome of one in-flight lookup, shared with coalesced callers."""
+
+    __slots__ = ('done', 'addresses', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.addresses = None
+        self.error = None
+
+
+class DNSCache:
+    """
+    Thread-safe hostname -> addresses cache that honors record TTLs.
+
+    Concurrent lookups for the same host are coalesced: the first caller
+    resolves while the others wait for its answer, so a burst of new
+    connections to one host costs a single query. Failed lookups are not
+    cached: the caller and every waiter coalesced onto it see the error, and
+    the next connect retries. An expired answer is never served.
+    """
+
+    def __init__(self, default_ttl: float = 300.0, max_ttl: float = 3600.0,
+                 lookup: Optional[Callable] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            default_ttl (float): Seconds to keep answers whose TTL is unknown,
+                which is every answer when dnspython is not installed
+            max_ttl (float): Upper bound on how long any answer is kept
+            lookup (Callable, optional): Function host -> (addresses, ttl);
+                defaults to dnspython when available, else getaddrinfo
+            clock (Callable): Monotonic time source
+        """
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self.lookup = lookup or (record_lookup if dns is not None else system_lookup)
+        self.clock = clock
+        self._entries = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def resolve(self, host: str) -> List[str]:
+        """
+        Return the addresses for a host, from cache while its TTL lasts.
+
+        IP literals are returned as-is without touching the cache.
+
+        Raises:
+            socket.gaierror: If the host cannot be resolved
+        """
+        try:
+            ipaddress.ip_address(host.strip('[]'))
+            return [host]
+        except ValueError:
+            pass
+
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and entry[1] > self.clock():
+                self.hits += 1
+                return entry[0]
+            pending = self._pending.get(host)
+            if pending is None:
+                pending = self._pending[host] = _PendingLookup()
+                self.misses += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.addresses
+
+        try:
+            addresses, ttl = self.lookup(host)
+            ttl = min(self.default_ttl if ttl is None else ttl, self.max_ttl)
+            with self._lock:
+                self._entries[host] = (addresses, self.clock() + ttl)
+            pending.addresses = addresses
+            return addresses
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[host]
+            pending.done.set()
+
+    def stats(self) -> dict:
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: hits, misses, coalesced (lookups that waited on another
+            thread's query), entries and hit_ratio (0-1)
+        """
+        with self._lock:
+            hits, misses, coalesced = self.hits, self.misses, self.coalesced
+            entries = len(self._entries)
+        served = hits + misses + coalesced
+        return {
+            'hits': hits,
+            'misses': misses,
+            'coalesced': coalesced,
+            'entries': entries,
+            'hit_ratio': (hits + coalesced) / served if served else 0.0,
+        }
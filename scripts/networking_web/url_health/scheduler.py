@@ -0,0 +1,188 @@
+"""
+Heap-based scheduler for continuous URL monitoring.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class MonitorTarget:
+    """A URL to check repeatedly every `interval` seconds, +/- `jitter`."""
+
+    __slots__ = ('url', 'interval', 'jitter')
+
+    def __init__(self, url: str, interval: float = 60.0, jitter: float = 0.0):
+        self.url = url
+        self.interval = interval
+        self.jitter = jitter
+
+    def __repr__(self):
+        return f"MonitorTarget({self.url!r}, interval={self.interval}, jitter={self.jitter})"
+
+
+class CheckScheduler:
+    """
+    Dispatch periodic checks to a worker pool from a single priority queue.
+
+    Targets sit in a min-heap ordered by their next due time. The dispatcher
+    sleeps on a condition variable until the earliest target is due (or a new
+    one is added), so it never busy-waits, and each dispatch costs O(log n)
+    heap work regardless of how many endpoints are scheduled. A target is
+    rescheduled only after its check finishes, so one URL is never checked
+    twice at the same time.
+    """
+
+    def __init__(self, workers: int = 50, max_in_flight: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            workers (int): Number of worker threads running checks
+            max_in_flight (int, optional): Maximum dispatched but unfinished
+                checks (default: 2 * workers)
+            clock (Callable): Monotonic time source
+        """
+        self.workers = workers
+        self.max_in_flight = max_in_flight or 2 * workers
+        self.clock = clock
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        # Statistics for benchmarking the scheduler itself
+        self.dispatched = 0
+        self.overhead = 0.0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, target: MonitorTarget, first_due: Optional[float] = None):
+        """
+        Schedule a target.
+
+        Args:
+            target (MonitorTarget): The target to check periodically
+            first_due (float, optional): Clock time of the first check; by
+                default a random point within the first interval, so a large
+                list does not fire all at once
+        """
+        if first_due is None:
+            first_due = self.clock() + random.uniform(0, target.interval)
+        self._push(first_due, target)
+
+    def add_many(self, targets, first_due: Optional[float] = None):
+        """
+        Schedule many targets at once with a single O(n) heapify.
+
+        Args:
+            targets (Iterable[MonitorTarget]): Targets to check periodically
+            first_due (float, optional): Clock time the first checks are
+                spread from (default: now); each target starts at a random
+                point within its first interval after it
+        """
+        start = self.clock() if first_due is None else first_due
+        with self._cond:
+            self._heap.extend((start + random.uniform(0, t.interval), next(self._seq), t)
+                              for t in targets)
+            heapq.heapify(self._heap)
+            self._cond.notify()
+
+    def _push(self, due: float, target: MonitorTarget):
+        with self._cond:
+            start = time.perf_counter()
+            heapq.heappush(self._heap, (due, next(self._seq), target))
+            self.overhead += time.perf_counter() - start
+            self._cond.notify()
+
+    def stop(self):
+        """
+        Ask run() to return after the checks already in flight finish.
+
+        A stop() that arrives before run() starts makes run() return at once.
+        Each stop ends one run; run() can be called again afterwards.
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def run(self, check: Callable[[str], dict],
+            on_result: Optional[Callable[[MonitorTarget, dict], None]] = None,
+            duration: Optional[float] = None):
+        """
+        Dispatch due checks until stop() is called or `duration` elapses.
+
+        Args:
+            check (Callable): Function called with a URL, returning a result
+            on_result (Callable, optional): Called with (target, result) on
+                the worker thread after each check
+            duration (float, optional): Seconds to run before stopping
+        """
+        self.dispatched = 0
+        self.overhead = 0.0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+        deadline = self.clock() + duration if duration is not None else None
+        slots = threading.Semaphore(self.max_in_flight)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                with self._cond:
+                    now = self.clock()
+                    if self._stopped or (deadline is not None and now >= deadline):
+                        self._stopped = False
+                        break
+                    if not self._heap or self._heap[0][0] > now:
+                        wake = self._heap[0][0] if self._heap else float('inf')
+                        if deadline is not None:
+                            wake = min(wake, deadline)
+                        self._cond.wait(None if wake == float('inf') else wake - now)
+                        continue
+                    start = time.perf_counter()
+                    due, _, target = heapq.heappop(self._heap)
+                    self.overhead += time.perf_counter() - start
+
+                lateness = now - due
+                self.total_lateness += lateness
+                self.max_lateness = max(self.max_lateness, lateness)
+                self.dispatched += 1
+
+                # Backpressure: wait for a free slot rather than queueing unbounded work
+                slots.acquire()
+                executor.submit(self._run_one, target, due, check, on_result, slots)
+
+    def _run_one(self, target, due, check, on_result, slots):
+        """Run one check, report it and put the target back in the heap."""
+        try:
+            result = check(target.url)
+            if on_result is not None:
+                on_result(target, result)
+        finally:
+            slots.release()
+            # Keep the original cadence unless the check overran its interval
+            next_due = max(due + target.interval, self.clock())
+            if target.jitter:
+                next_due += random.uniform(-target.jitter, target.jitter)
+            self._push(next_due, target)
+
+    def stats(self) -> dict:
+        """
+        Return dispatcher statistics.
+
+        Returns:
+            dict: dispatched count, scheduler overhead per dispatch in
+            microseconds, and mean/max lateness in milliseconds
+        """
+        n = self.dispatched or 1
+        return {
+            'dispatched': self.dispatched,
+            'overhead_us_per_dispatch': self.overhead / n * 1e6,
+            'mean_lateness_ms': self.total_lateness / n * 1000,
+            'max_lateness_ms': self.max_lateness * 1000,
+        }
@@ -0,0 +1,52 @@
+"""
+Helpers for splitting a check run across worker processes by host.
+"""
+
+import threading
+import zlib
+from typing import Dict
+
+
+def shard_of(host: str, shards: int) -> int:
+    """
+    Return the shard a host belongs to.
+
+    Uses CRC32 rather than hash(), which is randomized per process, so every
+    process agrees on the mapping.
+    """
+    return zlib.crc32(host.encode('utf-8')) % shards
+
+
+class QueueWriter:
+    """
+    Result writer that ships results from a worker process to the parent
+    over a multiprocessing queue, `batch_size` at a time to keep pickling
+    and queue overhead per result low.
+
+    Messages are tuples ('results', shard, [result, ...]).
+    """
+
+    def __init__(self, queue, shard: int, batch_size: int = 100):
+        self.queue = queue
+        self.shard = shard
+        self.batch_size = batch_size
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def write(self, result: Dict):
+        with self._lock:
+            self._buffer.append(result)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            self.queue.put(('results', self.shard, self._buffer))
+            self._buffer = []
+
+    def close(self):
+        self.flush()
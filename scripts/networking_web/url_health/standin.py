@@ -0,0 +1,140 @@
+"""
+Local stand-in HTTP server for benchmarking the health checker without
+touching the internet.
+"""
+
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Answer every request according to the server's defaults, overridable per
+    request with query parameters:
+
+        ?delay=0.05   seconds to wait before responding
+        ?status=503   HTTP status code to return
+        ?size=4096    response body size in bytes
+        ?drop=0.1     fraction of requests answered by closing the
+                      connection without a response
+
+    Every response carries an ETag derived from its size, and a request whose
+    If-None-Match matches it gets 304 Not Modified.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without TCP_NODELAY the
+    # body waits on the client's delayed ACK and every response gains ~40 ms
+    disable_nagle_algorithm = True
+
+    def _knobs(self):
+        query = parse_qs(urlsplit(self.path).query)
+        defaults = self.server.defaults
+
+        def knob(name, cast):
+            return cast(query[name][0]) if name in query else defaults[name]
+        return knob('delay', float), knob('status', int), knob('size', int), knob('drop', float)
+
+    def _respond(self, send_body):
+        delay, status, size, drop = self._knobs()
+        if delay:
+            time.sleep(delay)
+        if drop and random.random() < drop:
+            # Hang up mid-request, as an overloaded or crashing server would
+            self.close_connection = True
+            with self.server.lock:
+                self.server.requests_dropped += 1
+            return
+        etag = f'"{size}"'
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            status, send_body = 304, False
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+        if send_body and size:
+            self.wfile.write(b'x' * size)
+        with self.server.lock:
+            self.server.requests_served += 1
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def log_message(self, *args):
+        pass
+
+
+class _QueueingHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer with a listen backlog large enough for load tests."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class StandInServer:
+    """
+    Threaded local HTTP server, usable as a context manager.
+
+    Example:
+        >>> with StandInServer(delay=0.01) as server:
+        ...     checker.check_url(server.url('/page'))
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, delay: float = 0.0,
+                 status: int = 200, size: int = 512, drop: float = 0.0):
+        """
+        Args:
+            host (str): Interface to bind (default: 127.0.0.1)
+            port (int): Port to bind, 0 for any free port (default: 0)
+            delay (float): Default response delay in seconds
+            status (int): Default HTTP status code
+            size (int): Default response body size in bytes
+            drop (float): Default fraction of connections dropped (0-1)
+        """
+        self.httpd = _QueueingHTTPServer((host, port), StandInHandler)
+        self.httpd.defaults = {'delay': delay, 'status': status, 'size': size, 'drop': drop}
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests_served = 0
+        self.httpd.requests_dropped = 0
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests_served(self) -> int:
+        return self.httpd.requests_served
+
+    @property
+    def requests_dropped(self) -> int:
+        return self.httpd.requests_dropped
+
+    def url(self, path: str = '/') -> str:
+        """Return an absolute URL on this server."""
+        return self.base_url + path
+
+    def start(self):
+        """Start serving on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,161 @@
+"""
+Constant-memory latency statistics that can be merged across workers.
+"""
+
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+SUMMARY_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram with a bounded relative error on every percentile.
+
+    Each bucket covers values whose ratio is at most `gamma`, so a reported
+    percentile is within `relative_accuracy` of a real sample (1% by
+    default). Memory depends only on the range of values seen - about 1,400
+    buckets span 1 microsecond to 1 hour - never on the number of samples.
+    Two histograms with the same accuracy merge by adding bucket counts, so
+    workers can each keep their own and combine them at the end.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-3):
+        """
+        Args:
+            relative_accuracy (float): Maximum relative error of percentiles
+            min_value (float): Values at or below this are counted as zero
+        """
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def record(self, value: float):
+        """Add one sample."""
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= self.min_value:
+            self.zero_count += 1
+        else:
+            self.buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """
+        Add another histogram's samples into this one.
+
+        Raises:
+            ValueError: If the histograms use different accuracies
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge histograms with different relative accuracy")
+        for index, n in other.buckets.items():
+            self.buckets[index] += n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Return the value at percentile `p` (0-100), or None if empty.
+        """
+        if not self.count:
+            return None
+        rank = max(math.ceil(p / 100 * self.count), 1)
+        seen = self.zero_count
+        if rank <= seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Midpoint of the bucket, clamped to what was actually seen
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def percentiles(self, ps: Iterable[float] = SUMMARY_PERCENTILES) -> Dict[float, Optional[float]]:
+        """Return {p: value} for several percentiles."""
+        return {p: self.percentile(p) for p in ps}
+
+    def to_dict(self) -> Dict:
+        """Serialize to a JSON-compatible dict, e.g. to send between processes."""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'min_value': self.min_value,
+            'buckets': {str(k): v for k, v in self.buckets.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'total': self.total,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LatencyHistogram':
+        """Rebuild a histogram written by to_dict()."""
+        hist = cls(data['relative_accuracy'], data['min_value'])
+        hist.buckets.update({int(k): v for k, v in data['buckets'].items()})
+        hist.zero_count = data['zero_count']
+        hist.count = data['count']
+        hist.total = data['total']
+        if hist.count:
+            hist.min, hist.max = data['min'], data['max']
+        return hist
+
+
+class LatencyStats:
+    """An overall LatencyHistogram plus one per host, mergeable as a whole."""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.overall = LatencyHistogram(relative_accuracy)
+        self.hosts = {}
+
+    def record(self, host: str, value: float):
+        """Add one sample for `host`."""
+        self.overall.record(value)
+        hist = self.hosts.get(host)
+        if hist is None:
+            hist = self.hosts[host] = LatencyHistogram(self.relative_accuracy)
+        hist.record(value)
+
+    def merge(self, other: 'LatencyStats') -> 'LatencyStats':
+        """Add another LatencyStats' samples into this one."""
+        self.overall.merge(other.overall)
+        for host, hist in other.hosts.items():
+            if host in self.hosts:
+                self.hosts[host].merge(hist)
+            else:
+                self.hosts[host] = LatencyHistogram(self.relative_accuracy).merge(hist)
+        return self
+
+    def to_dict(self) -> Dict:
+        return {'relative_accuracy': self.relative_accuracy,
+                'overall': self.overall.to_dict(),
+                'hosts': {host: hist.to_dict() for host, hist in self.hosts.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LatencyStats':
+        stats = cls(data['relative_accuracy'])
+        stats.overall = LatencyHistogram.from_dict(data['overall'])
+        stats.hosts = {host: LatencyHistogram.from_dict(h) for host, h in data['hosts'].items()}
+        return stats
@@ -0,0 +1,37 @@
+"""
+Per-request phase timings (DNS, TCP connect, TLS, time-to-first-byte,
+transfer) collected with time.perf_counter.
+"""
+
+import threading
+
+PHASES = ('dns', 'connect', 'tls')
+
+_state = threading.local()
+
+
+def start_phases() -> dict:
+    """
+    Start collecting connection phase timings for the current thread.
+
+    Returns:
+        dict: Seconds spent per phase; filled in by the connection layer as
+        the request runs. Phases stay at 0 when a pooled connection is reused.
+    """
+    _state.phases = dict.fromkeys(PHASES, 0.0)
+    return _state.phases
+
+
+def stop_phases() -> dict:
+    """Stop collecting for the current thread and return the timings."""
+    phases = getattr(_state, 'phases', None)
+    _state.phases = None
+    return phases
+
+
+def record_phase(name: str, seconds: float):
+    """Add time to a phase if the current thread is collecting timings."""
+    phases = getattr(_state, 'phases', None)
+    if phases is not None:
+        phases[name] += seconds
+
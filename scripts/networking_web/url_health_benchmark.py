@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+URL Health Checker Benchmarks
+
+Measures the health checker against a local stand-in HTTP server, so results
+do not depend on the internet.
+
+    # Scheduler overhead as the number of monitored endpoints grows
+    python url_health_benchmark.py scheduler --endpoints 1000 10000 100000
+
+    # Checks per second with 1, 2 and 4 worker processes
+    python url_health_benchmark.py throughput --processes 1 2 4
+
+    # Load test against slow, flaky servers: 5% dropped connections, 20 ms
+    # responses; save the numbers and later fail if throughput regresses
+    python url_health_benchmark.py load --delay 0.02 --drop 0.05 --save baseline.json
+    python url_health_benchmark.py load --delay 0.02 --drop 0.05 --compare baseline.json
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from url_health.scheduler import CheckScheduler, MonitorTarget
+from url_health.standin import StandInServer
+from url_health.stats import SUMMARY_PERCENTILES
+from web_url_health_checker import URLHealthChecker
+
+
+def bench_scheduler(endpoints: int, rate: float, duration: float, workers: int,
+                    server: StandInServer) -> dict:
+    """
+    Monitor `endpoints` URLs at a fixed total check rate and report overhead.
+
+    The per-URL interval is endpoints / rate, so the number of checks per
+    second is the same for every endpoint count and only the heap size
+    changes. A flat overhead per dispatch means the scheduler scales.
+
+    Returns:
+        dict: CheckScheduler.stats() plus the endpoint count and achieved rate
+    """
+    checker = URLHealthChecker(timeout=5, pool_maxsize=workers)
+    scheduler = CheckScheduler(workers=workers)
+    interval = endpoints / rate
+    targets = [MonitorTarget(server.url(f'/endpoint/{i}'), interval) for i in range(endpoints)]
+    scheduler.add_many(targets)
+
+    scheduler.run(checker.check_url, duration=duration)
+    stats = scheduler.stats()
+    stats['endpoints'] = endpoints
+    stats['checks_per_second'] = stats['dispatched'] / duration
+    return stats
+
+
+def run_scheduler(args):
+    print(f"Scheduler benchmark: {args.rate:g} checks/s for {args.duration:g}s per run, "
+          f"{args.workers} workers\n")
+    print(f"{'Endpoints':>10}{'Checks/s':>10}{'Overhead us':>13}{'Mean late ms':>14}{'Max late ms':>13}")
+    print("-" * 60)
+    with StandInServer(size=128) as server:
+        for endpoints in args.endpoints:
+            stats = bench_scheduler(endpoints, args.rate, args.duration, args.workers, server)
+            print(f"{stats['endpoints']:>10}{stats['checks_per_second']:>10.0f}"
+                  f"{stats['overhead_us_per_dispatch']:>13.2f}{stats['mean_lateness_ms']:>14.2f}"
+                  f"{stats['max_lateness_ms']:>13.2f}")
+
+
+def _serve_standins(count: int, options: dict, ready, stop):
+    """Run `count` stand-in servers until `stop` is set (process entry point)."""
+    servers = [StandInServer(**options).start() for _ in range(count)]
+    ready.put([server.base_url for server in servers])
+    stop.wait()
+    for server in servers:
+        server.stop()
+
+
+@contextlib.contextmanager
+def standin_process(count: int, **options):
+    """
+    Run stand-in servers in a separate process, so serving requests does not
+    compete with the checker for this process's GIL.
+
+    Each server listens on its own port, which the checker treats as a
+    separate host, so host sharding has something to spread.
+
+    Args:
+        count (int): Number of servers
+        **options: StandInServer defaults (delay, status, size, drop)
+
+    Yields:
+        List[str]: Base URL of each server
+    """
+    ready, stop = multiprocessing.Queue(), multiprocessing.Event()
+    process = multiprocessing.Process(target=_serve_standins, daemon=True,
+                                      args=(count, options, ready, stop))
+    process.start()
+    try:
+        yield ready.get(timeout=30)
+    finally:
+        stop.set()
+        process.join(timeout=5)
+
+
+def _cpu_seconds() -> float:
+    """CPU time of this process plus its finished (joined) children."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def bench_throughput(urls, processes: int, concurrency: int, per_host: int,
+                     **checker_options) -> dict:
+    """
+    Check `urls` once and report throughput, CPU cost and latency.
+
+    Output from the checker is discarded so terminal speed does not count.
+    CPU time includes sharded worker processes but not the stand-in servers.
+
+    Args:
+        urls (List[str]): URLs to check
+        processes (int): Worker processes; 1 runs the concurrent engine here
+        concurrency (int): Checks in flight per process
+        per_host (int): Maximum checks in flight per host
+        **checker_options: Extra URLHealthChecker arguments
+
+    Returns:
+        dict: checks, up, elapsed seconds, checks_per_second,
+        cpu_ms_per_check and latency percentiles in milliseconds
+    """
+    checker = URLHealthChecker(pool_maxsize=per_host, keep_results=False, **checker_options)
+    cpu_start = _cpu_seconds()
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if processes > 1:
+            checker.check_urls_sharded(urls, processes, concurrency, per_host)
+        else:
+            checker.check_urls_concurrent(urls, concurrency, per_host)
+    elapsed = time.perf_counter() - start
+    cpu = _cpu_seconds() - cpu_start
+    checks = checker.totals['checked']
+    stats = {
+        'checks': checks,
+        'up': checker.totals['up'],
+        'elapsed': elapsed,
+        'checks_per_second': checks / elapsed,
+        'cpu_ms_per_check': cpu / checks * 1000 if checks else 0.0,
+    }
+    for p, value in checker.latency.overall.percentiles().items():
+        stats[f'p{p:g}_ms'] = value
+    return stats
+
+
+def run_throughput(args):
+    print(f"Throughput benchmark: {args.urls} URLs on {args.hosts} stand-in hosts, "
+          f"{args.concurrency} concurrent checks per process, {args.per_host} per host\n")
+    print(f"{'Processes':>10}{'Checks':>10}{'UP':>8}{'Seconds':>10}{'Checks/s':>10}{'CPU ms':>9}")
+    print("-" * 57)
+    with standin_process(args.hosts, delay=args.delay, size=args.size) as bases:
+        urls = [f"{bases[i % len(bases)]}/page/{i}" for i in range(args.urls)]
+        for processes in args.processes:
+            stats = bench_throughput(urls, processes, args.concurrency, args.per_host, timeout=10)
+            print(f"{processes:>10}{stats['checks']:>10}{stats['up']:>8}"
+                  f"{stats['elapsed']:>10.2f}{stats['checks_per_second']:>10.0f}"
+                  f"{stats['cpu_ms_per_check']:>9.2f}")
+
+
+def compare_to_baseline(stats: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compare a load run with a saved one.
+
+    Returns:
+        list: Messages for every metric more than `tolerance` (a fraction)
+        worse than the baseline; empty if nothing regressed
+    """
+    regressions = []
+    higher_is_better = {'checks_per_second'}
+    for key in ('checks_per_second', 'cpu_ms_per_check', 'p50_ms', 'p99_ms'):
+        old, new = baseline.get(key), stats.get(key)
+        if not old or new is None:
+            continue
+        change = (old - new) / old if key in higher_is_better else (new - old) / old
+        if change > tolerance:
+            regressions.append(f"{key}: {old:.2f} -> {new:.2f} ({change * 100:.0f}% worse)")
+    return regressions
+
+
+def run_load(args):
+    print(f"Load benchmark: {args.urls} URLs on {args.hosts} stand-in hosts "
+          f"(delay {args.delay:g}s, status {args.status}, {args.size} B, drop {args.drop:.0%}), "
+          f"{args.processes} process(es) x {args.concurrency} concurrent checks\n")
+    with standin_process(args.hosts, delay=args.delay, status=args.status,
+                         size=args.size, drop=args.drop) as bases:
+        urls = [f"{bases[i % len(bases)]}/page/{i}" for i in range(args.urls)]
+        stats = bench_throughput(urls, args.processes, args.concurrency, args.per_host,
+                                 timeout=args.timeout, probe=args.probe, retries=args.retries,
+                                 breaker_threshold=0)
+
+    print(f"Checks:          {stats['checks']} ({stats['up']} UP)")
+    print(f"Elapsed:         {stats['elapsed']:.2f} s")
+    print(f"Throughput:      {stats['checks_per_second']:.0f} checks/s")
+    print(f"CPU per check:   {stats['cpu_ms_per_check']:.3f} ms")
+    if stats['p50_ms'] is not None:
+        print("Latency:         " + " / ".join(f"p{p:g} {stats[f'p{p:g}_ms']:.1f}"
+                                              for p in SUMMARY_PERCENTILES) + " ms")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare_to_baseline(stats, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.compare}:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print(f"\nNo regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks for web_url_health_checker.py')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    scheduler = subparsers.add_parser('scheduler', help='Monitor scheduler overhead vs endpoint count')
+    scheduler.add_argument('--endpoints', type=int, nargs='+', default=[1000, 10000, 100000],
+                           help='Endpoint counts to try (default: 1000 10000 100000)')
+    scheduler.add_argument('--rate', type=float, default=200,
+                           help='Total checks per second (default: 200)')
+    scheduler.add_argument('--duration', type=float, default=5,
+                           help='Seconds per run (default: 5)')
+    scheduler.add_argument('--workers', type=int, default=20,
+                           help='Worker threads (default: 20)')
+    scheduler.set_defaults(func=run_scheduler)
+
+    throughput = subparsers.add_parser('throughput', help='Checks per second vs worker processes')
+    throughput.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4],
+                            help='Worker process counts to try (default: 1 2 4)')
+    throughput.add_argument('--urls', type=int, default=5000,
+                            help='URLs checked per run (default: 5000)')
+    throughput.add_argument('--hosts', type=int, default=16,
+                            help='Stand-in servers, each a separate host (default: 16)')
+    throughput.add_argument('-c', '--concurrency', type=int, default=100,
+                            help='Concurrent checks per process (default: 100)')
+    throughput.add_argument('--per-host', type=int, default=6,
+                            help='Maximum concurrent checks per host (default: 6)')
+    throughput.add_argument('--delay', type=float, default=0.0,
+                            help='Server response delay in seconds (default: 0)')
+    throughput.add_argument('--size', type=int, default=512,
+                            help='Response body size in bytes (default: 512)')
+    throughput.set_defaults(func=run_throughput)
+
+    load = subparsers.add_parser('load', help='Throughput, CPU per check and latency against '
+                                              'configurable stand-in servers')
+    load.add_argument('--urls', type=int, default=5000, help='URLs checked (default: 5000)')
+    load.add_argument('--hosts', type=int, default=16,
+                      help='Stand-in servers, each a separate host (default: 16)')
+    load.add_argument('--processes', type=int, default=1,
+                      help='Worker processes for sharded checking (default: 1)')
+    load.add_argument('-c', '--concurrency', type=int, default=100,
+                      help='Concurrent checks per process (default: 100)')
+    load.add_argument('--per-host', type=int, default=6,
+                      help='Maximum concurrent checks per host (default: 6)')
+    load.add_argument('--delay', type=float, default=0.0,
+                      help='Server response delay in seconds (default: 0)')
+    load.add_argument('--status', type=int, default=200,
+                      help='HTTP status the servers return (default: 200)')
+    load.add_argument('--size', type=int, default=512,
+                      help='Response body size in bytes (default: 512)')
+    load.add_argument('--drop', type=float, default=0.0,
+                      help='Fraction of requests answered by dropping the connection (default: 0)')
+    load.add_argument('--timeout', type=float, default=10,
+                      help='Checker request timeout in seconds (default: 10)')
+    load.add_argument('--retries', type=int, default=0,
+                      help='Checker retries per URL (default: 0)')
+    load.add_argument('--probe', action='store_true', help='Use body-less probe mode')
+    load.add_argument('--save', help='Write the results to this JSON file')
+    load.add_argument('--compare', help='Exit 1 if results regressed against this JSON file')
+    load.add_argument('--tolerance', type=float, default=0.2,
+                      help='Allowed fractional regression for --compare (default: 0.2)')
+    load.set_defaults(func=run_load)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
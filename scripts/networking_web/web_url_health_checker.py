@@ -15,24 +15,257 @@ import requests
 import time
 import json
 import csv
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Tuple
+from queue import Empty, Full
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
 import sys
 import argparse
 
+from url_health.breaker import CircuitBreaker, backoff_delay
+from url_health.cache import ValidatorCache
+from url_health.metrics import MetricsRegistry, MetricsServer
+from url_health.output import RESULT_FIELDS, CSVWriter, HistoryWriter, JSONLWriter, ResultWriter
+from url_health.pool import create_session
+from url_health.resolver import DNSCache
+from url_health.scheduler import CheckScheduler, MonitorTarget
+from url_health.history import StateStore
+from url_health.ingest import dedupe_urls, iter_url_lines
+from url_health.shard import QueueWriter, shard_of
+from url_health.stats import SUMMARY_PERCENTILES, LatencyHistogram, LatencyStats
+from url_health.timing import start_phases, stop_phases
+
+
+def normalize_url(url: str) -> str:
+    """
+    Ensure a URL has a scheme, defaulting to https.
+
+    Args:
+        url (str): The URL as given by the user
+
+    Returns:
+        str: The URL with an http:// or https:// prefix
+    """
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
+
+
+def host_of(url: str) -> str:
+    """
+    Return the lowercase host[:port] of a URL, used as the per-host limit key.
+
+    Args:
+        url (str): The URL to inspect
+
+    Returns:
+        str: The network location of the URL
+    """
+    return urlsplit(normalize_url(url)).netloc.lower()
+
+
+def _declared_length(value: Optional[str]) -> Optional[int]:
+    """Parse a Content-Length header, returning None if missing or malformed."""
+    try:
+        length = int(value)
+    except (TypeError, ValueError):
+        return None
+    return length if length >= 0 else None
+
+
+def _known_length(urls: Iterable[str]) -> Optional[int]:
+    """Return len(urls) for lists and other sized inputs, else None."""
+    return len(urls) if hasattr(urls, '__len__') else None
+
+
+def _progress(done: int, total: Optional[int]) -> str:
+    """Format a progress counter such as "[3/10]", or "[3]" for streamed input."""
+    return f"[{done}/{total}]" if total is not None else f"[{done}]"
+
+
+def _describe(total: Optional[int]) -> str:
+    return f"{total} URL(s)" if total is not None else "streamed URLs"
+
 
 class URLHealthChecker:
     """A class to check the health status of URLs."""
 
-    def __init__(self, timeout: int = 10):
+    # Hosts listed in the per-host latency breakdown of print_summary()
+    SUMMARY_HOSTS = 10
+
+    # Bytes per read when a full body is counted and discarded
+    READ_CHUNK = 65536
+
+    # Responses that mean the host itself is struggling: retried, and counted
+    # by the circuit breaker like timeouts and connection errors
+    RETRY_STATUSES = {502, 503, 504}
+
+    # URLs read ahead of the concurrent engine per concurrency slot; bounds
+    # memory for streamed input while keeping busy hosts from idling the pool
+    PENDING_PER_SLOT = 4
+
+    # URLs per batch sent to a sharded worker process, and batches queued per worker
+    SHARD_BATCH = 500
+    SHARD_QUEUE_BATCHES = 4
+    # Seconds a full worker inbox is waited on before checking that the worker is alive
+    SHARD_PUT_TIMEOUT = 1.0
+
+    # Result fields filled in by each attempt
+    ATTEMPT_FIELDS = ('status_code', 'response_time', 'dns_time', 'connect_time', 'tls_time',
+                      'ttfb_time', 'transfer_time', 'bytes_received', 'error')
+
+    def __init__(self, timeout: int = 10, pool_connections: int = 100,
+                 pool_maxsize: int = 10, probe: bool = False,
+                 max_body_bytes: int = 1024, verify_length: bool = False,
+                 dns_ttl: float = 300.0, keep_results: bool = True,
+                 cache_file: str = None, retries: int = 0, backoff: float = 0.5,
+                 breaker_threshold: int = 0, breaker_reset: float = 30.0,
+                 state_store: StateStore = None, changes_only: bool = False):
         """
         Initialize the URL Health Checker.
 
         Args:
             timeout (int): Request timeout in seconds (default: 10)
+            pool_connections (int): Number of hosts to keep connection pools
+                for (default: 100)
+            pool_maxsize (int): Maximum keep-alive connections per host
+                (default: 10)
+            probe (bool): Body-less probing: send HEAD first and fall back to
+                a streamed GET that stops after max_body_bytes (default: False)
+            max_body_bytes (int): Bytes read by the probe GET fallback
+                (default: 1024)
+            verify_length (bool): Mark a URL DOWN when a fully read body does
+                not match its Content-Length header (default: False)
+            dns_ttl (float): Seconds to cache DNS answers whose TTL is
+                unknown; 0 disables the cache (default: 300)
+            keep_results (bool): Keep every result in self.results; turn off
+                when streaming results to writers (default: True)
+            cache_file (str): JSON file of ETag/Last-Modified validators to
+                send as conditional headers; None disables (default: None)
+            retries (int): Extra attempts after a timeout, connection error
+                or 502/503/504 (default: 0)
+            backoff (float): Upper bound in seconds of the first jittered
+                retry delay, doubling per retry (default: 0.5)
+            breaker_threshold (int): Consecutive host failures that make
+                further checks of that host fail fast; 0 disables (default: 0)
+            breaker_reset (float): Seconds before a tripped host gets a
+                single probe check (default: 30)
+            state_store (StateStore): Store recording each URL's state
+                transitions and latency rollups (default: None)
+            changes_only (bool): Print only checks that changed a URL's
+                state in state_store (default: False)
         """
+        # Constructor options, passed on to the checkers of worker processes
+        self.options = {
+            'timeout': timeout, 'pool_connections': pool_connections,
+            'pool_maxsize': pool_maxsize, 'probe': probe, 'max_body_bytes': max_body_bytes,
+            'verify_length': verify_length, 'dns_ttl': dns_ttl, 'cache_file': cache_file,
+            'retries': retries, 'backoff': backoff, 'breaker_threshold': breaker_threshold,
+            'breaker_reset': breaker_reset,
+        }
         self.timeout = timeout
+        self.probe = probe
+        self.max_body_bytes = max_body_bytes
+        self.verify_length = verify_length
+        self.keep_results = keep_results
+        self.validators = ValidatorCache(cache_file) if cache_file else None
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset) if breaker_threshold > 0 else None
         self.results = []
+        self.writers = []
+        self.metrics = None
+        self._feed_error = None
+        self._feed_dropped = 0
+        self.state_store = state_store
+        self.changes_only = changes_only and state_store is not None
+        self._totals_lock = threading.Lock()
+        self._reset_totals()
+        # One shared session so URLs on the same host reuse TCP/TLS connections
+        self.dns_cache = DNSCache(default_ttl=dns_ttl) if dns_ttl > 0 else None
+        self.session = create_session(pool_connections, pool_maxsize, dns_cache=self.dns_cache)
+
+    def add_writer(self, writer: ResultWriter):
+        """
+        Stream every future result to a writer as soon as it completes.
+
+        Args:
+            writer (ResultWriter): e.g. a JSONLWriter, CSVWriter or HistoryWriter
+        """
+        self.writers.append(writer)
+
+    def enable_metrics(self) -> MetricsRegistry:
+        """
+        Start keeping Prometheus metrics, updated as each check finishes.
+
+        Returns:
+            MetricsRegistry: The registry, e.g. to serve with MetricsServer
+        """
+        if self.metrics is None:
+            self.metrics = MetricsRegistry(host_key=host_of)
+        return self.metrics
+
+    def close_writers(self):
+        """Flush and close all writers added with add_writer()."""
+        for writer in self.writers:
+            writer.close()
+        self.writers = []
+
+    def _reset_totals(self):
+        with self._totals_lock:
+            self.totals = {'checked': 0, 'up': 0, 'bytes': 0, 'not_modified': 0, 'retries': 0}
+            self.latency = LatencyStats()
+            # 304s skip the body, so they get their own latency distribution
+            self.not_modified_latency = LatencyHistogram()
+            # Connection and DNS counters reported by worker processes
+            self.worker_counts = Counter()
+
+    def _record(self, result: Dict, account: bool = True) -> bool:
+        """
+        Account for a finished check: update the running totals and latency
+        histograms used by print_summary() and pass the result to every writer.
+
+        Args:
+            result (Dict): A result dictionary from check_url()
+            account (bool): Update totals; False for results from worker
+                processes, whose totals are merged separately
+
+        Returns:
+            bool: Whether the check should be printed: always, unless
+            changes_only is set and the URL's state did not change
+        """
+        for writer in self.writers:
+            writer.write(result)
+        if self.metrics is not None:
+            self.metrics.observe(result)
+        changed = True
+        if self.state_store is not None:
+            changed = self.state_store.record(result) or not self.changes_only
+        if account:
+            self._account(result)
+        return changed
+
+    def _account(self, result: Dict):
+        """Add a result to the running totals and latency histograms."""
+        with self._totals_lock:
+            totals = self.totals
+            totals['checked'] += 1
+            if result['status'] == 'UP':
+                totals['up'] += 1
+            if result['status_code'] == 304:
+                totals['not_modified'] += 1
+                self.not_modified_latency.record(result['response_time'])
+            elif result['response_time']:
+                self.latency.record(host_of(result['url']), result['response_time'])
+            totals['bytes'] += result['bytes_received'] or 0
+            totals['retries'] += max(result['attempts'] - 1, 0)
 
     def check_url(self, url: str) -> Dict:
         """
@@ -47,87 +280,587 @@ class URLHealthChecker:
                   - status: 'UP' or 'DOWN'
                   - status_code: HTTP status code (or None if failed)
                   - response_time: Response time in milliseconds
+                  - dns_time: DNS resolution time in milliseconds
+                  - connect_time: TCP connect time in milliseconds
+                  - tls_time: TLS handshake time in milliseconds
+                  - ttfb_time: Time from sending the request to the first
+                    response byte, in milliseconds
+                  - transfer_time: Body download time in milliseconds
+                  - bytes_received: Response body bytes read
+                  - attempts: Requests sent, 0 if the host's circuit was open
                   - timestamp: Check timestamp
                   - error: Error message (if any)
+
+                  The connection phases are 0 when a pooled keep-alive
+                  connection is reused, and all phases are None on failure.
+                  Fields describe the last attempt when retries are enabled.
         """
         result = {
             'url': url,
             'status': 'DOWN',
             'status_code': None,
             'response_time': None,
+            'dns_time': None,
+            'connect_time': None,
+            'tls_time': None,
+            'ttfb_time': None,
+            'transfer_time': None,
+            'bytes_received': None,
+            'attempts': 0,
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'error': None
         }
 
         # Ensure URL has a scheme
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-            result['url'] = url
+        url = normalize_url(url)
+        result['url'] = url
+        host = host_of(url)
 
+        if self.metrics is not None:
+            self.metrics.check_started()
         try:
-            start_time = time.time()
-            response = requests.get(url, timeout=self.timeout, allow_redirects=True)
-            end_time = time.time()
+            self._check_attempts(url, host, result)
+        finally:
+            if self.metrics is not None:
+                self.metrics.check_finished()
+        return result
+
+    def _check_attempts(self, url: str, host: str, result: Dict):
+        """
+        Run check_url()'s attempts: retry host failures with backoff and
+        fail fast while the host's circuit is open.
+
+        Args:
+            url (str): The normalized URL to check
+            host (str): Its host key
+            result (Dict): Result dictionary to fill in
+        """
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(backoff_delay(attempt - 1, self.backoff))
+            if self.breaker is not None and not self.breaker.allow(host):
+                result.update(dict.fromkeys(self.ATTEMPT_FIELDS), status='DOWN',
+                              error='Circuit open: host is failing, check skipped')
+                break
+            result['attempts'] += 1
+            host_failure = self._attempt(url, result)
+            if self.breaker is not None:
+                self.breaker.record(host, success=not host_failure)
+            if not host_failure:
+                break
+
+    def _attempt(self, url: str, result: Dict) -> bool:
+        """
+        Make one request for check_url() and fill in the result fields.
+
+        Args:
+            url (str): The normalized URL to request
+            result (Dict): Result dictionary to fill in
+
+        Returns:
+            bool: True if the failure points at the host itself (timeout,
+            connection error or a RETRY_STATUSES response), so it is worth
+            retrying and counts against the host's circuit
+        """
+        result.update(dict.fromkeys(self.ATTEMPT_FIELDS), status='DOWN')
+        try:
+            phases = start_phases()
+            start_time = time.perf_counter()
+            response, hops, body_size, complete = self._fetch(url)
+            end_time = time.perf_counter()
 
             # Calculate response time in milliseconds
             response_time = round((end_time - start_time) * 1000, 2)
 
             result['status_code'] = response.status_code
             result['response_time'] = response_time
+            result['bytes_received'] = body_size
+            self._record_phases(result, phases, hops, end_time - start_time)
 
             # Consider 2xx and 3xx status codes as UP
             if 200 <= response.status_code < 400:
                 result['status'] = 'UP'
+                declared = _declared_length(response.headers.get('Content-Length'))
+                if (self.verify_length and complete and declared is not None
+                        and response.request.method != 'HEAD' and response.status_code != 304
+                        and declared != body_size):
+                    result['status'] = 'DOWN'
+                    result['error'] = f'Content-Length mismatch: expected {declared}, got {body_size}'
             else:
                 result['status'] = 'DOWN'
                 result['error'] = f'HTTP {response.status_code}'
+                return response.status_code in self.RETRY_STATUSES
 
         except requests.exceptions.Timeout:
             result['error'] = 'Request timeout'
+            return True
         except requests.exceptions.ConnectionError:
             result['error'] = 'Connection error'
+            return True
         except requests.exceptions.TooManyRedirects:
             result['error'] = 'Too many redirects'
         except requests.exceptions.RequestException as e:
             result['error'] = f'Request failed: {str(e)}'
         except Exception as e:
             result['error'] = f'Unexpected error: {str(e)}'
+        finally:
+            stop_phases()
 
-        return result
+        return False
+
+    def _fetch(self, url: str):
+        """
+        Request a URL using the configured mode.
+
+        In probe mode a HEAD request is tried first. If the server rejects it
+        (any 4xx/5xx, since many servers mishandle HEAD), a streamed GET reads
+        at most max_body_bytes and then closes the response.
+
+        With a validator cache, known ETag/Last-Modified values are sent as
+        conditional headers and the final response's validators are stored.
+
+        Args:
+            url (str): The normalized URL to request
+
+        Returns:
+            Tuple: (final response, every response including redirects and a
+            rejected HEAD, body bytes read, whether the body was read fully)
+        """
+        headers = self.validators.headers_for(url) if self.validators is not None else None
+        if not self.probe:
+            response = self.session.get(url, headers=headers, timeout=self.timeout,
+                                        allow_redirects=True, stream=True)
+            self._store_validators(url, response)
+            # Count the body without keeping it; a full read leaves the
+            # connection reusable
+            complete = False
+            try:
+                body_size = sum(len(chunk) for chunk in
+                                response.raw.stream(self.READ_CHUNK, decode_content=False))
+                complete = True
+            finally:
+                if complete:
+                    response.raw.release_conn()
+                else:
+                    response.close()
+            return response, response.history + [response], body_size, True
+
+        head = self.session.head(url, headers=headers, timeout=self.timeout, allow_redirects=True)
+        hops = head.history + [head]
+        if head.status_code < 400:
+            self._store_validators(url, head)
+            return head, hops, 0, True
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout,
+                                    allow_redirects=True, stream=True)
+        self._store_validators(url, response)
+        complete = False
+        try:
+            body = response.raw.read(self.max_body_bytes, decode_content=False)
+            complete = not response.raw.read(1, decode_content=False)
+        finally:
+            # A fully read body leaves the connection reusable; otherwise drop it
+            # rather than draining an arbitrarily large download
+            if complete:
+                response.raw.release_conn()
+            else:
+                response.close()
+        return response, hops + response.history + [response], len(body), complete
+
+    def _store_validators(self, url: str, response):
+        """Remember a successful response's ETag/Last-Modified, if caching."""
+        if self.validators is not None and 200 <= response.status_code < 300:
+            self.validators.update(url, response)
+
+    def save_cache(self):
+        """Write the validator cache to its file, if one is configured."""
+        if self.validators is not None:
+            self.validators.save()
+
+    @staticmethod
+    def _record_phases(result: Dict, phases: Dict, hops: List, total: float):
+        """
+        Split a check's total time into its phases.
+
+        requests measures `elapsed` from sending each request (including any
+        new connection) to parsing its headers; the remainder of the total is
+        body transfer. Connection phases come from the pooled adapter.
+
+        Args:
+            result (Dict): Result dictionary to fill in
+            phases (Dict): Connection phase seconds from start_phases()
+            hops (List): Every requests.Response of the check, in order
+            total (float): Total check time in seconds
+        """
+        until_headers = sum(r.elapsed.total_seconds() for r in hops)
+        connection = phases['dns'] + phases['connect'] + phases['tls']
+        result['dns_time'] = round(phases['dns'] * 1000, 2)
+        result['connect_time'] = round(phases['connect'] * 1000, 2)
+        result['tls_time'] = round(phases['tls'] * 1000, 2)
+        result['ttfb_time'] = round(max(until_headers - connection, 0.0) * 1000, 2)
+        result['transfer_time'] = round(max(total - until_headers, 0.0) * 1000, 2)
 
-    def check_urls(self, urls: List[str]) -> List[Dict]:
+    def check_urls(self, urls: Iterable[str]) -> List[Dict]:
         """
         Check the health of multiple URLs.
 
         Args:
-            urls (List[str]): List of URLs to check
+            urls (Iterable[str]): URLs to check; a generator is consumed
+                lazily, one URL at a time
 
         Returns:
             List[Dict]: List of check results for all URLs
         """
         self.results = []
-        print(f"\nChecking {len(urls)} URL(s)...\n")
+        self._reset_totals()
+        total = _known_length(urls)
+        print(f"\nChecking {_describe(total)}...\n")
         print("-" * 80)
 
         for i, url in enumerate(urls, 1):
-            print(f"[{i}/{len(urls)}] Checking: {url}")
+            if not self.changes_only:
+                print(f"{_progress(i, total)} Checking: {url}")
             result = self.check_url(url)
-            self.results.append(result)
+            show = self._record(result)
+            if self.keep_results:
+                self.results.append(result)
+            if show:
+                if self.changes_only:
+                    print(f"{_progress(i, total)} State changed: {result['url']}")
+                self._print_result(result)
+
+        return self.results
+
+    def check_urls_concurrent(self, urls: Iterable[str], concurrency: int = 50,
+                              per_host: int = 6) -> List[Dict]:
+        """
+        Check the health of multiple URLs concurrently using asyncio.
+
+        Checks are scheduled on an event loop and run on a worker pool of
+        `concurrency` threads, so total time is close to that of the slowest
+        batch rather than the sum of all requests. A per-host semaphore keeps
+        any single server from receiving more than `per_host` requests at once.
+        URLs are pulled from `urls` only as slots free up, so a generator is
+        never read far ahead of the checks.
+
+        Args:
+            urls (Iterable[str]): URLs to check
+            concurrency (int): Maximum number of checks in flight (default: 50)
+            per_host (int): Maximum checks in flight per host (default: 6)
+
+        Returns:
+            List[Dict]: Check results in the same order and shape as check_urls()
+        """
+        self.results = []
+        self._reset_totals()
+        print(f"\nChecking {_describe(_known_length(urls))} with up to {concurrency} concurrent checks...\n")
+        print("-" * 80)
+        self.results = asyncio.run(self._check_urls_async(urls, concurrency, per_host))
+        return self.results
+
+    async def _check_urls_async(self, urls: Iterable[str], concurrency: int,
+                                per_host: int) -> List[Dict]:
+        """
+        Run check_url for every URL under global and per-host limits.
+
+        At most concurrency * PENDING_PER_SLOT URLs are read ahead, waiting
+        for a global or per-host slot, at any time. Streamed input is read on
+        a separate thread, so a slow file or pipe never stalls the event loop
+        while finished checks wait to be recorded.
+
+        Args:
+            urls (Iterable[str]): URLs to check
+            concurrency (int): Maximum number of checks in flight
+            per_host (int): Maximum checks in flight per host
 
-            # Display result
-            status_symbol = "✓" if result['status'] == 'UP' else "✗"
-            print(f"{status_symbol} Status: {result['status']}")
+        Returns:
+            List[Dict]: Check results in input order, or an empty list when
+            keep_results is off
+        """
+        loop = asyncio.get_running_loop()
+        global_limit = asyncio.Semaphore(concurrency)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(per_host))
+        pending_limit = asyncio.Semaphore(concurrency * self.PENDING_PER_SLOT)
+        total = _known_length(urls)
+        results = {}
+        done = 0
+
+        async def run_one(i: int, url: str):
+            nonlocal done
+            # Take the host slot first so waiting on a busy host never holds a global slot
+            async with host_limits[host_of(url)]:
+                async with global_limit:
+                    result = await loop.run_in_executor(executor, self.check_url, url)
+            done += 1
+            show = self._record(result)
+            if self.keep_results:
+                results[i] = result
+            if show:
+                print(f"{_progress(done, total)} Checked: {result['url']}")
+                self._print_result(result)
+
+        def finished(task):
+            pending.discard(task)
+            pending_limit.release()
+
+        # In-memory sequences are read directly; anything else may block
+        iterator = iter(urls)
+        reader = ThreadPoolExecutor(max_workers=1) if total is None else None
+        end = object()
+
+        async def next_url():
+            if reader is None:
+                return next(iterator, end)
+            return await loop.run_in_executor(reader, next, iterator, end)
+
+        pending = set()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                i = 0
+                while True:
+                    await pending_limit.acquire()
+                    url = await next_url()
+                    if url is end:
+                        break
+                    task = asyncio.ensure_future(run_one(i, url))
+                    pending.add(task)
+                    task.add_done_callback(finished)
+                    i += 1
+                await asyncio.gather(*pending)
+        finally:
+            if reader is not None:
+                reader.shutdown(wait=False)
+        return [results[i] for i in sorted(results)]
+
+    def check_urls_sharded(self, urls: Iterable[str], processes: int = 0, concurrency: int = 50,
+                           per_host: int = 6) -> List[Dict]:
+        """
+        Check URLs across several worker processes, each running its own
+        concurrent engine.
+
+        URLs are sharded by a hash of their host, so every host is checked
+        by exactly one process and `per_host` still bounds what a server
+        sees. A feeder thread streams URLs to the workers in small batches
+        over bounded queues, so input is read only as fast as it is checked.
+        Workers send results back in batches; they are printed and written
+        here as they arrive, while each worker's totals and latency
+        histograms are merged into this checker once it finishes.
 
-            if result['status_code']:
-                print(f"  HTTP Status: {result['status_code']}")
-            if result['response_time']:
-                print(f"  Response Time: {result['response_time']} ms")
-            if result['error']:
-                print(f"  Error: {result['error']}")
-            print("-" * 80)
+        Args:
+            urls (Iterable[str]): URLs to check
+            processes (int): Worker processes; 0 uses one per CPU (default: 0)
+            concurrency (int): Checks in flight per process (default: 50)
+            per_host (int): Maximum checks in flight per host (default: 6)
+
+        Returns:
+            List[Dict]: Check results in completion order, or an empty list
+            when keep_results is off
 
+        Raises:
+            Exception: Whatever reading `urls` raised, once the URLs read
+            before it have been checked
+        """
+        self.results = []
+        self._reset_totals()
+        self._feed_error = None
+        self._feed_dropped = 0
+        processes = processes or os.cpu_count() or 1
+        total = _known_length(urls)
+        print(f"\nChecking {_describe(total)} in {processes} process(es) with up to "
+              f"{concurrency} concurrent checks each...\n")
+        print("-" * 80)
+
+        queue = multiprocessing.Queue()
+        inboxes = [multiprocessing.Queue(maxsize=self.SHARD_QUEUE_BATCHES) for _ in range(processes)]
+        workers = [multiprocessing.Process(target=_check_shard, daemon=True,
+                                           args=(i, inbox, self.options, concurrency, per_host, queue))
+                   for i, inbox in enumerate(inboxes)]
+        for worker in workers:
+            worker.start()
+        feeder = threading.Thread(target=self._feed_shards, args=(urls, inboxes, workers), daemon=True)
+        feeder.start()
+
+        done = 0
+        running = len(workers)
+        while running:
+            try:
+                kind, shard, payload = queue.get(timeout=1)
+            except Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    print(f"✗ {running} worker(s) exited without reporting")
+                    break
+                continue
+            if kind == 'results':
+                for result in payload:
+                    done += 1
+                    show = self._record(result, account=False)
+                    if self.keep_results:
+                        self.results.append(result)
+                    if show:
+                        print(f"{_progress(done, total)} Checked: {result['url']}")
+                        self._print_result(result)
+            elif kind == 'done':
+                running -= 1
+                self._merge_worker(payload)
+            else:
+                running -= 1
+                print(f"✗ Worker {shard} failed: {payload}")
+
+        for worker in workers:
+            worker.join()
+        # Every live worker has read its end marker, and sends to dead ones
+        # give up after one timeout, so the feeder is about to finish
+        feeder.join(timeout=2 * self.SHARD_PUT_TIMEOUT)
+        for inbox in inboxes:
+            # Batches left for a worker that died are never read; don't
+            # block interpreter exit flushing them
+            inbox.cancel_join_thread()
+        if feeder.is_alive():
+            print("✗ Stopped reading URLs: no worker is left to check them")
+        if self._feed_dropped:
+            print(f"✗ {self._feed_dropped} URL(s) not checked: their worker exited")
+        if self._feed_error is not None:
+            raise self._feed_error
         return self.results
 
+    def _feed_shards(self, urls: Iterable[str], inboxes: List, workers: Optional[List] = None):
+        """
+        Send URLs to worker inboxes in batches, by host shard, then a None
+        to each inbox to mark the end of input.
+
+        The end markers are sent even if reading `urls` fails, so workers
+        always finish; the error is kept in _feed_error for the parent. A
+        worker that exits early stops reading its inbox: its URLs are
+        counted in _feed_dropped instead of blocking the other shards, and
+        reading stops once every worker has exited.
+
+        Args:
+            urls (Iterable[str]): URLs to check
+            inboxes (List): One queue per shard
+            workers (List, optional): The process reading each inbox
+        """
+        batches = [[] for _ in inboxes]
+        dead = set()
+
+        def send(shard, batch):
+            while shard not in dead:
+                try:
+                    inboxes[shard].put(batch, timeout=self.SHARD_PUT_TIMEOUT)
+                    return
+                except Full:
+                    if workers is not None and not workers[shard].is_alive():
+                        dead.add(shard)
+            if batch:
+                self._feed_dropped += len(batch)
+
+        try:
+            for url in urls:
+                shard = shard_of(host_of(url), len(inboxes))
+                batches[shard].append(url)
+                if len(batches[shard]) >= self.SHARD_BATCH:
+                    send(shard, batches[shard])
+                    batches[shard] = []
+                    if len(dead) == len(inboxes):
+                        break
+        except Exception as e:
+            self._feed_error = e
+        finally:
+            for shard, batch in enumerate(batches):
+                if batch:
+                    send(shard, batch)
+                send(shard, None)
+
+    def _merge_worker(self, summary: Dict):
+        """
+        Merge the totals reported by a finished worker process.
+
+        Args:
+            summary (Dict): The worker's totals, latency histograms,
+                connection/DNS counters and validator cache updates, as sent
+                by _check_shard()
+        """
+        with self._totals_lock:
+            for key, value in summary['totals'].items():
+                self.totals[key] += value
+            self.latency.merge(LatencyStats.from_dict(summary['latency']))
+            self.not_modified_latency.merge(LatencyHistogram.from_dict(summary['not_modified_latency']))
+            self.worker_counts.update(summary['counts'])
+        if self.validators is not None:
+            self.validators.merge(summary['validators'])
+
+    def monitor(self, targets: List[MonitorTarget], workers: int = 50,
+                duration: float = None) -> CheckScheduler:
+        """
+        Continuously check URLs, each on its own interval, until interrupted.
+
+        Checks are dispatched from a heap-based scheduler to a pool of
+        `workers` threads. Results are printed as one line each and passed
+        to any writers, but are not kept in self.results, so memory stays
+        flat however long it runs.
+
+        Args:
+            targets (List[MonitorTarget]): URLs with their interval and jitter
+            workers (int): Number of worker threads (default: 50)
+            duration (float): Seconds to run; None runs until Ctrl+C
+
+        Returns:
+            CheckScheduler: The scheduler, for its dispatch statistics
+        """
+        scheduler = CheckScheduler(workers=workers)
+        scheduler.add_many(targets)
+
+        print(f"\nMonitoring {len(targets)} URL(s) with {workers} worker(s). Press Ctrl+C to stop.\n")
+        try:
+            scheduler.run(self.check_url, self._on_monitor_result, duration)
+        except KeyboardInterrupt:
+            scheduler.stop()
+        return scheduler
+
+    def _on_monitor_result(self, target: MonitorTarget, result: Dict):
+        """Record a monitoring check and print it."""
+        if self._record(result):
+            self._print_monitor_line(target, result)
+
+    def _print_monitor_line(self, target: MonitorTarget, result: Dict):
+        """
+        Print a one-line summary of a monitoring check.
+
+        Args:
+            target (MonitorTarget): The target that was checked
+            result (Dict): A result dictionary from check_url()
+        """
+        status_symbol = "✓" if result['status'] == 'UP' else "✗"
+        details = []
+        if result['response_time']:
+            details.append(f"{result['response_time']} ms")
+        if result['error']:
+            details.append(result['error'])
+        print(f"{result['timestamp']} {status_symbol} {result['status']:<4} {result['url']} ({', '.join(details)})")
+
+    def _print_result(self, result: Dict):
+        """
+        Print the outcome of a single check.
+
+        Args:
+            result (Dict): A result dictionary from check_url()
+        """
+        status_symbol = "✓" if result['status'] == 'UP' else "✗"
+        print(f"{status_symbol} Status: {result['status']}")
+
+        if result['status_code']:
+            print(f"  HTTP Status: {result['status_code']}")
+        if result['response_time']:
+            print(f"  Response Time: {result['response_time']} ms")
+            if result['ttfb_time'] is not None:
+                print(f"  Phases: DNS {result['dns_time']} / Connect {result['connect_time']} / "
+                      f"TLS {result['tls_time']} / TTFB {result['ttfb_time']} / "
+                      f"Transfer {result['transfer_time']} ms")
+        if result['attempts'] > 1:
+            print(f"  Attempts: {result['attempts']}")
+        if result['error']:
+            print(f"  Error: {result['error']}")
+        print("-" * 80)
+
     def save_to_json(self, filename: str = 'url_health_report.json'):
         """
         Save results to a JSON file.
@@ -155,41 +888,130 @@ class URLHealthChecker:
                 return
 
             with open(filename, 'w', newline='', encoding='utf-8') as f:
-                fieldnames = ['url', 'status', 'status_code', 'response_time', 'timestamp', 'error']
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
                 writer.writeheader()
                 writer.writerows(self.results)
             print(f"✓ Results saved to {filename}")
         except Exception as e:
             print(f"\n✗ Error saving CSV file: {e}")
 
+    @staticmethod
+    def _format_percentiles(hist) -> str:
+        """Format a histogram's summary percentiles, e.g. 'p50 12.3 / p99 80.1 ms'."""
+        parts = [f"p{p:g} {value:.1f}" for p, value in hist.percentiles(SUMMARY_PERCENTILES).items()]
+        return " / ".join(parts) + " ms"
+
     def print_summary(self):
         """
         Print a summary of the health check results.
+
+        Uses the running totals kept as each check finishes, so it works the
+        same whether or not results are kept in memory.
         """
-        if not self.results:
+        with self._totals_lock:
+            totals = dict(self.totals)
+            latency = LatencyStats().merge(self.latency)
+        if not totals['checked']:
             print("\nNo results to summarize.")
             return
 
-        total = len(self.results)
-        up_count = sum(1 for r in self.results if r['status'] == 'UP')
+        total = totals['checked']
+        up_count = totals['up']
         down_count = total - up_count
 
-        # Calculate average response time for UP URLs
-        response_times = [r['response_time'] for r in self.results if r['response_time']]
-        avg_response_time = round(sum(response_times) / len(response_times), 2) if response_times else 0
-
         print("\n" + "="*80)
         print("SUMMARY")
         print("="*80)
         print(f"Total URLs checked: {total}")
         print(f"✓ UP: {up_count} ({(up_count/total*100):.1f}%)")
         print(f"✗ DOWN: {down_count} ({(down_count/total*100):.1f}%)")
-        if avg_response_time > 0:
-            print(f"Average Response Time: {avg_response_time} ms")
+        if latency.overall.count:
+            print(f"Average Response Time: {latency.overall.mean:.2f} ms")
+            print(f"Response Time Percentiles: {self._format_percentiles(latency.overall)}")
+            if len(latency.hosts) > 1:
+                print(f"Slowest hosts by p99 (of {len(latency.hosts)}):")
+                slowest = sorted(latency.hosts.items(), key=lambda item: item[1].percentile(99),
+                                 reverse=True)
+                for host, hist in slowest[:self.SUMMARY_HOSTS]:
+                    print(f"  {host}: {self._format_percentiles(hist)} ({hist.count} checks)")
+        if totals['not_modified']:
+            print(f"Not Modified (304): {totals['not_modified']} "
+                  f"({self._format_percentiles(self.not_modified_latency)})")
+        print(f"Body bytes received: {totals['bytes']}")
+        counts = Counter(self.worker_counts)
+        pool = self.session.pool_adapter.stats()
+        counts.update({'requests': pool['requests'], 'connections_opened': pool['connections_opened']})
+        if counts['requests']:
+            reused = max(counts['requests'] - counts['connections_opened'], 0)
+            print(f"Connections: {counts['connections_opened']} opened for {counts['requests']} requests "
+                  f"({reused / counts['requests'] * 100:.1f}% reused)")
+        if self.dns_cache is not None:
+            dns = self.dns_cache.stats()
+            counts.update({f'dns_{key}': dns[key] for key in ('hits', 'misses', 'coalesced', 'entries')})
+            hits = counts['dns_hits'] + counts['dns_coalesced']
+            lookups = hits + counts['dns_misses']
+            print(f"DNS cache: {hits} hits, {counts['dns_misses']} misses "
+                  f"({hits / lookups * 100 if lookups else 0:.1f}% hit rate, {counts['dns_entries']} hosts)")
+        if totals['retries']:
+            print(f"Retries: {totals['retries']}")
+        if self.breaker is not None:
+            breaker = self.breaker.stats()
+            counts.update({f'breaker_{key}': breaker[key] for key in ('trips', 'rejected')})
+            if counts['breaker_trips']:
+                print(f"Circuit breaker: tripped {counts['breaker_trips']} time(s), "
+                      f"{counts['breaker_rejected']} check(s) failed fast")
         print("="*80)
 
 
+def _iter_inbox(inbox) -> Iterator[str]:
+    """Yield URLs from batches on a queue until a None arrives."""
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            return
+        yield from batch
+
+
+def _check_shard(shard: int, inbox, options: Dict, concurrency: int,
+                 per_host: int, queue):
+    """
+    Worker process entry point for URLHealthChecker.check_urls_sharded().
+
+    Checks the URLs arriving on `inbox` quietly, streams results to the
+    parent through a QueueWriter, then sends ('done', shard, summary) with
+    the totals, latency histograms and connection counters, or
+    ('error', shard, message).
+    """
+    sys.stdout = open(os.devnull, 'w')
+    urls = _iter_inbox(inbox)
+    try:
+        checker = URLHealthChecker(keep_results=False, **options)
+        checker.add_writer(QueueWriter(queue, shard))
+        try:
+            if concurrency > 1:
+                checker.check_urls_concurrent(urls, concurrency, per_host)
+            else:
+                checker.check_urls(urls)
+        finally:
+            checker.close_writers()
+
+        pool = checker.session.pool_adapter.stats()
+        counts = {'requests': pool['requests'], 'connections_opened': pool['connections_opened']}
+        if checker.dns_cache is not None:
+            dns = checker.dns_cache.stats()
+            counts.update({f'dns_{key}': dns[key] for key in ('hits', 'misses', 'coalesced', 'entries')})
+        if checker.breaker is not None:
+            breaker = checker.breaker.stats()
+            counts.update({f'breaker_{key}': breaker[key] for key in ('trips', 'rejected')})
+        queue.put(('done', shard, {'totals': checker.totals,
+                                   'latency': checker.latency.to_dict(),
+                                   'not_modified_latency': checker.not_modified_latency.to_dict(),
+                                   'validators': checker.validators.updated if checker.validators else {},
+                                   'counts': counts}))
+    except Exception as e:
+        queue.put(('error', shard, f"{type(e).__name__}: {e}"))
+
+
 def read_urls_from_file(filename: str) -> List[str]:
     """
     Read URLs from a text file (one URL per line).
@@ -212,6 +1034,62 @@ def read_urls_from_file(filename: str) -> List[str]:
         return []
 
 
+def parse_monitor_targets(lines: List[str], interval: float, jitter: float) -> List[MonitorTarget]:
+    """
+    Build monitor targets from URL lines with optional per-URL settings.
+
+    Each line is "URL [interval [jitter]]"; missing values use the defaults.
+
+    Args:
+        lines (List[str]): URL lines, e.g. from read_urls_from_file()
+        interval (float): Default seconds between checks of one URL
+        jitter (float): Default random +/- seconds added to each interval
+
+    Returns:
+        List[MonitorTarget]: One target per line
+    """
+    targets = []
+    for line in lines:
+        parts = line.split()
+        url_interval = float(parts[1]) if len(parts) > 1 else interval
+        url_jitter = float(parts[2]) if len(parts) > 2 else jitter
+        targets.append(MonitorTarget(parts[0], url_interval, url_jitter))
+    return targets
+
+
+def print_uptime(store: StateStore, url: str, days: float):
+    """
+    Print a URL's uptime and latency rollups from a state store.
+
+    Args:
+        store (StateStore): Opened state store
+        url (str): URL as checked (normalized)
+        days (float): Length of the report window, ending now
+
+    Returns:
+        bool: False if the store has no observations of the URL in the window
+    """
+    since = store.clock() - days * 86400
+    report = store.uptime(url, since)
+    if report is None:
+        print(f"No history for {url} in the last {days:g} days")
+        return False
+    print(f"Uptime of {url} over the last {days:g} days")
+    print(f"  Uptime:      {report['uptime'] * 100:.3f}%")
+    print(f"  Observed:    {report['observed_seconds'] / 3600:.1f}h")
+    print(f"  Down:        {report['down_seconds'] / 60:.1f}min")
+    print(f"  Transitions: {report['transitions']}")
+    periods = [p for p in store.rollups(url, since) if p['timed']]
+    if periods:
+        # Only checks that got a response have a latency
+        mean = sum(p['latency_sum'] for p in periods) / sum(p['timed'] for p in periods)
+        print(f"  Latency:     mean {mean:.2f}ms, "
+              f"min {min(p['min_latency'] for p in periods):.2f}ms, "
+              f"max {max(p['max_latency'] for p in periods):.2f}ms "
+              f"over {len(periods)} rollup periods")
+    return True
+
+
 def main():
     """
     Main function to run the URL Health Checker.
@@ -235,55 +1113,236 @@ Examples:
 
   # Set custom timeout
   python web_url_health_checker.py -u https://example.com -t 20
+
+  # Check a large list with 200 concurrent checks, at most 4 per host
+  python web_url_health_checker.py -f urls.txt -c 200 --per-host 4
+
+  # Probe without downloading bodies (HEAD, then a GET capped at 4 KiB)
+  python web_url_health_checker.py -f urls.txt --probe --max-body-bytes 4096
+
+  # Stream results to url_health_report.jsonl as they finish and keep a
+  # rotating history across runs
+  python web_url_health_checker.py -f urls.txt --stream --history history.jsonl
+
+  # Retry timeouts and 5xx twice, and stop requesting a host after 5 straight failures
+  python web_url_health_checker.py -f urls.txt -c 50 --retries 2 --breaker-threshold 5
+
+  # Re-check a list every few minutes, skipping unchanged bodies via 304s
+  python web_url_health_checker.py -f urls.txt --cache validators.json
+
+  # Monitor with a Prometheus scrape endpoint on port 9101
+  python web_url_health_checker.py -f urls.txt --monitor --metrics-port 9101
+
+  # Stream a 50M-line crawl export from stdin with flat memory
+  zcat crawl.txt.gz | python web_url_health_checker.py -f - --dedupe bloom --stream -c 200
+
+  # Shard a very large list across 4 processes by host, 200 checks in flight each
+  python web_url_health_checker.py -f urls.txt --processes 4 -c 200
+
+  # Monitor, printing only UP/DOWN changes, then report 30-day uptime
+  python web_url_health_checker.py -f urls.txt --monitor --state-dir state --changes-only
+  python web_url_health_checker.py --state-dir state --uptime https://example.com --days 30
+
+  # Monitor continuously: every 60s +/- 5s, 100 workers
+  # (file lines may override per URL: "https://example.com 30 2")
+  python web_url_health_checker.py -f urls.txt --monitor --interval 60 --jitter 5 -c 100
         """
     )
 
     parser.add_argument('-u', '--urls', nargs='+', help='URL(s) to check')
-    parser.add_argument('-f', '--file', help='File containing URLs (one per line)')
+    parser.add_argument('-f', '--file', help='File containing URLs (one per line), or - for stdin')
     parser.add_argument('-o', '--output', default='url_health_report',
                         help='Output filename prefix (default: url_health_report)')
     parser.add_argument('-t', '--timeout', type=int, default=10,
                         help='Request timeout in seconds (default: 10)')
+    parser.add_argument('-c', '--concurrency', type=int, default=1,
+                        help='Number of concurrent checks; above 1 uses the asyncio engine (default: 1)')
+    parser.add_argument('--dedupe', choices=['exact', 'bloom', 'none'], default='exact',
+                        help='Skip repeated URLs with an exact set, a Bloom filter that grows with the '
+                             'input (for huge lists; skips at most --bloom-error-rate of unique URLs) '
+                             'or not at all (default: exact)')
+    parser.add_argument('--bloom-capacity', type=int, default=10_000_000,
+                        help='Unique URLs the Bloom filter starts sized for; it grows past this '
+                             'without losing accuracy (default: 10000000)')
+    parser.add_argument('--bloom-error-rate', type=float, default=0.001,
+                        help='Bound on the share of unique URLs the Bloom filter wrongly skips as '
+                             'repeats, however large the input grows (default: 0.001)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Worker processes to shard URLs across by host; 0 uses one per CPU (default: 1)')
+    parser.add_argument('--per-host', type=int, default=6,
+                        help='Maximum concurrent checks per host with --concurrency (default: 6)')
+    parser.add_argument('--monitor', action='store_true',
+                        help='Keep checking each URL on its interval until interrupted')
+    parser.add_argument('--interval', type=float, default=60,
+                        help='Seconds between checks of one URL in monitor mode (default: 60)')
+    parser.add_argument('--jitter', type=float, default=0,
+                        help='Random +/- seconds added to each interval in monitor mode (default: 0)')
+    parser.add_argument('--duration', type=float,
+                        help='Stop monitor mode after this many seconds')
+    parser.add_argument('--probe', action='store_true',
+                        help='Send HEAD first and fall back to a byte-capped streamed GET')
+    parser.add_argument('--max-body-bytes', type=int, default=1024,
+                        help='Bytes read by the --probe GET fallback (default: 1024)')
+    parser.add_argument('--verify-length', action='store_true',
+                        help='Mark URLs DOWN when a fully read body does not match Content-Length')
+    parser.add_argument('--pool-size', type=int, default=10,
+                        help='Maximum keep-alive connections per host (default: 10)')
+    parser.add_argument('--pool-hosts', type=int, default=100,
+                        help='Number of hosts to keep connection pools for (default: 100)')
+    parser.add_argument('--retries', type=int, default=0,
+                        help='Retries after a timeout, connection error or 502/503/504 (default: 0)')
+    parser.add_argument('--backoff', type=float, default=0.5,
+                        help='Maximum first retry delay in seconds, doubling per retry (default: 0.5)')
+    parser.add_argument('--breaker-threshold', type=int, default=0,
+                        help='Consecutive failures after which a host\'s remaining checks fail fast; '
+                             '0 disables (default: 0)')
+    parser.add_argument('--breaker-reset', type=float, default=30,
+                        help='Seconds before a tripped host gets one probe check (default: 30)')
+    parser.add_argument('--cache',
+                        help='JSON file of ETag/Last-Modified validators; unchanged pages answer 304 '
+                             'without a body')
+    parser.add_argument('--dns-ttl', type=float, default=300,
+                        help='Seconds to cache DNS answers without a known TTL; 0 disables (default: 300)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Append results to OUTPUT.jsonl / OUTPUT.csv as they finish instead of '
+                             'keeping them in memory until the end')
+    parser.add_argument('--flush-every', type=int, default=100,
+                        help='Results buffered between writes with --stream/--history (default: 100)')
+    parser.add_argument('--history',
+                        help='Append every result to this JSONL file, shared across runs')
+    parser.add_argument('--history-max-mb', type=float, default=10,
+                        help='Rotate the history file at this size (default: 10)')
+    parser.add_argument('--history-backups', type=int, default=5,
+                        help='Rotated history files to keep (default: 5)')
+    parser.add_argument('--state-dir',
+                        help='Record each URL\'s UP/DOWN transitions and latency rollups in this '
+                             'directory, shared across runs')
+    parser.add_argument('--rollup-minutes', type=float, default=60,
+                        help='Length of a latency rollup period in --state-dir (default: 60)')
+    parser.add_argument('--changes-only', action='store_true',
+                        help='Print only checks whose UP/DOWN state changed (requires --state-dir)')
+    parser.add_argument('--uptime', metavar='URL',
+                        help='Report uptime and latency of URL from --state-dir, then exit')
+    parser.add_argument('--days', type=float, default=30,
+                        help='Window of the --uptime report in days (default: 30)')
+    parser.add_argument('--metrics-port', type=int,
+                        help='Serve Prometheus metrics at http://HOST:PORT/metrics while checking')
+    parser.add_argument('--metrics-host', default='127.0.0.1',
+                        help='Interface for --metrics-port (default: 127.0.0.1)')
     parser.add_argument('--json', action='store_true', help='Save results as JSON')
     parser.add_argument('--csv', action='store_true', help='Save results as CSV')
 
     args = parser.parse_args()
+    if (args.changes_only or args.uptime) and not args.state_dir:
+        parser.error('--changes-only and --uptime require --state-dir')
+    if args.processes < 0:
+        parser.error('--processes must be 0 (one per CPU) or more')
 
-    # Collect URLs
-    urls = []
+    state_store = None
+    if args.state_dir:
+        state_store = StateStore(args.state_dir, rollup_seconds=args.rollup_minutes * 60)
+    if args.uptime:
+        try:
+            return 0 if print_uptime(state_store, normalize_url(args.uptime), args.days) else 1
+        finally:
+            state_store.close()
+
+    # Collect URLs; a file is streamed line by line unless monitoring, whose
+    # lines may carry per-URL intervals
+    sources = []
     if args.urls:
-        urls.extend(args.urls)
+        sources.append(args.urls)
     if args.file:
-        urls.extend(read_urls_from_file(args.file))
+        if args.monitor:
+            sources.append(read_urls_from_file(args.file))
+        elif args.file == '-' or os.path.isfile(args.file):
+            sources.append(iter_url_lines(args.file))
+        else:
+            print(f"Error: File '{args.file}' not found.")
+    urls = itertools.chain.from_iterable(sources)
 
     # If no URLs provided, use example URLs
-    if not urls:
+    first = next(urls, None)
+    if first is None:
         print("No URLs provided. Using example URLs for demonstration...\n")
-        urls = [
+        urls = iter([
             'https://www.google.com',
             'https://github.com',
             'https://www.python.org',
             'https://this-site-definitely-does-not-exist-12345.com'
-        ]
+        ])
+    else:
+        urls = itertools.chain([first], urls)
 
     # Remove duplicates while preserving order
-    urls = list(dict.fromkeys(urls))
+    ingest_counts = {}
+    if args.monitor:
+        urls = list(dict.fromkeys(urls))
+    else:
+        urls = dedupe_urls(urls, args.dedupe, args.bloom_capacity, args.bloom_error_rate,
+                           normalize=normalize_url, counts=ingest_counts)
 
     # Create checker and run checks
-    checker = URLHealthChecker(timeout=args.timeout)
-    checker.check_urls(urls)
+    checker = URLHealthChecker(timeout=args.timeout, pool_connections=args.pool_hosts,
+                               pool_maxsize=args.pool_size, probe=args.probe,
+                               max_body_bytes=args.max_body_bytes,
+                               verify_length=args.verify_length, dns_ttl=args.dns_ttl,
+                               keep_results=not args.stream, cache_file=args.cache,
+                               retries=args.retries, backoff=args.backoff,
+                               breaker_threshold=args.breaker_threshold,
+                               breaker_reset=args.breaker_reset, state_store=state_store,
+                               changes_only=args.changes_only)
+    both = not args.json and not args.csv
+    if args.stream:
+        if args.json or both:
+            checker.add_writer(JSONLWriter(f"{args.output}.jsonl", args.flush_every))
+        if args.csv or both:
+            checker.add_writer(CSVWriter(f"{args.output}.csv", args.flush_every))
+    if args.history:
+        checker.add_writer(HistoryWriter(args.history, int(args.history_max_mb * 1024 * 1024),
+                                         args.history_backups, args.flush_every))
+
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(checker.enable_metrics(), args.metrics_host, args.metrics_port).start()
+        print(f"Serving metrics at {metrics_server.url}")
+
+    try:
+        if args.monitor:
+            targets = parse_monitor_targets(urls, args.interval, args.jitter)
+            checker.monitor(targets, workers=max(args.concurrency, 1), duration=args.duration)
+            return 0
+
+        if args.processes != 1:
+            checker.check_urls_sharded(urls, args.processes, args.concurrency, args.per_host)
+        elif args.concurrency > 1:
+            checker.check_urls_concurrent(urls, args.concurrency, args.per_host)
+        else:
+            checker.check_urls(urls)
+    finally:
+        checker.close_writers()
+        checker.save_cache()
+        if state_store is not None:
+            state_store.close()
+        if metrics_server is not None:
+            metrics_server.stop()
 
     # Print summary
     checker.print_summary()
+    if ingest_counts.get('duplicates'):
+        print(f"Skipped {ingest_counts['duplicates']} duplicate URLs ({args.dedupe} dedupe)")
 
     # Save results
-    if args.json or (not args.json and not args.csv):
-        checker.save_to_json(f"{args.output}.json")
-    if args.csv or (not args.json and not args.csv):
-        checker.save_to_csv(f"{args.output}.csv")
+    if args.stream:
+        print(f"\n✓ Results streamed to {args.output}.*")
+    else:
+        if args.json or both:
+            checker.save_to_json(f"{args.output}.json")
+        if args.csv or both:
+            checker.save_to_csv(f"{args.output}.csv")
 
     # Return exit code based on results
-    down_count = sum(1 for r in checker.results if r['status'] == 'DOWN')
+    down_count = checker.totals['checked'] - checker.totals['up']
     return 1 if down_count > 0 else 0
 
 
@@ -0,0 +1,115 @@
+"""
+Byte-for-byte verification of files that hashed the same.
+
+Used by duplicate_finder.py before reporting groups and by dedup_actions.py
+before replacing a file.
+"""
+import mmap
+import os
+from collections import defaultdict
+
+VERIFY_CHUNK_SIZE = 1024 * 1024
+VERIFY_MAX_OPEN = 64
+
+
+def _sweep(paths, chunk_size):
+    """
+    Partition files into classes of identical content in one read sweep.
+
+    Every file is memory-mapped and the files are walked chunk by chunk. At
+    each offset a class is split by the bytes of that chunk, so N files are
+    read once instead of compared pair by pair, and a file stops being read
+    as soon as it diverges from all others. Files that cannot be opened are
+    reported and left out.
+
+    Returns:
+        list: Lists of paths with identical content, including singletons.
+    """
+    files, maps = [], {}
+    try:
+        for path in paths:
+            try:
+                f = open(path, 'rb')
+            except OSError as e:
+                print(f"Error verifying {path}: {e}")
+                continue
+            files.append(f)
+            try:
+                size = os.fstat(f.fileno()).st_size
+                maps[path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+            except (OSError, ValueError) as e:
+                print(f"Error verifying {path}: {e}")
+
+        by_size = defaultdict(list)
+        for path in paths:
+            if path in maps:
+                by_size[len(maps[path])].append(path)
+
+        classes = []
+        for size, groups in by_size.items():
+            groups = [groups]
+            offset = 0
+            while offset < size and any(len(g) > 1 for g in groups):
+                next_groups = []
+                for group in groups:
+                    if len(group) == 1:
+                        next_groups.append(group)
+                        continue
+                    by_chunk = defaultdict(list)
+                    for path in group:
+                        by_chunk[maps[path][offset:offset + chunk_size]].append(path)
+                    next_groups.extend(by_chunk.values())
+                groups = next_groups
+                offset += chunk_size
+            classes.extend(groups)
+        return classes
+    finally:
+        for m in maps.values():
+            if isinstance(m, mmap.mmap):
+                m.close()
+        for f in files:
+            f.close()
+
+
+def verify_group(paths, chunk_size=VERIFY_CHUNK_SIZE, max_open=VERIFY_MAX_OPEN):
+    """
+    Byte-compare a group of supposedly identical files.
+
+    Groups of up to `max_open` files are compared in a single sweep. Larger
+    groups are swept in batches, and each batch's classes are merged into
+    the classes found so far by sweeping their first paths together, so no
+    more than `max_open` files are ever open at once. An unreadable file is
+    dropped without affecting the rest of the group.
+
+    Args:
+        paths (list): Paths of equal-size files.
+        chunk_size (int): Bytes compared per step.
+        max_open (int): Most files open at the same time (at least 2).
+
+    Returns:
+        list: Lists of paths with identical content, two or more per list.
+    """
+    max_open = max(max_open, 2)
+    if len(paths) <= max_open:
+        return [c for c in _sweep(paths, chunk_size) if len(c) > 1]
+
+    step = max_open // 2
+    classes = []
+    for start in range(0, len(paths), step):
+        fresh = _sweep(paths[start:start + step], chunk_size)
+        # Compare the new classes against known classes a window at a time
+        for offset in range(0, len(classes), max_open - step):
+            if not fresh:
+                break
+            known = {c[0]: c for c in classes[offset:offset + max_open - step]}
+            new = {c[0]: c for c in fresh}
+            for group in _sweep(list(known) + list(new), chunk_size):
+                match = next((p for p in group if p in known), None)
+                if match is None:
+                    continue
+                for path in group:
+                    if path in new:
+                        known[match].extend(new[path])
+                        fresh.remove(new[path])
+        classes.extend(fresh)
+    return [c for c in classes if len(c) > 1]
@@ -0,0 +1,279 @@
+import os
+import sys
+import json
+import argparse
+
+from byte_verify import verify_group
+
+KEEP_POLICIES = ['oldest', 'shortest', 'root']
+ACTIONS = ['delete', 'hardlink', 'reflink']
+
+# ioctl request number for FICLONE on Linux (btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+
+
+def choose_keeper(paths, keep='oldest', preferred_root=None):
+    """
+    Pick the file to keep from a group of duplicates.
+
+    A path whose inode has other names (st_nlink > 1) is always preferred:
+    the group only lists one name per inode, so relinking or deleting that
+    name would leave the other names on the old data and free nothing.
+
+    Args:
+        paths (list): Paths with identical content.
+        keep (str): 'oldest' (earliest mtime), 'shortest' (shortest path) or
+            'root' (first path under `preferred_root`, else the oldest).
+        preferred_root (str, optional): Directory preferred by the 'root' policy.
+
+    Returns:
+        str: The path to keep.
+    """
+    stats = {}
+    for path in paths:
+        try:
+            stats[path] = os.stat(path)
+        except OSError:
+            stats[path] = None
+
+    if keep == 'root' and preferred_root:
+        root = os.path.join(os.path.abspath(preferred_root), '')
+        under_root = [p for p in paths if os.path.abspath(p).startswith(root)]
+        if under_root:
+            paths, keep = under_root, 'shortest'
+        else:
+            keep = 'oldest'
+
+    def links(path):
+        return stats[path].st_nlink if stats[path] else 0
+    most = max(links(p) for p in paths)
+    if most > 1:
+        paths = [p for p in paths if links(p) == most]
+
+    if keep == 'shortest':
+        return min(paths, key=lambda p: (len(p), p))
+
+    def mtime(path):
+        return stats[path].st_mtime_ns if stats[path] else float('inf')
+    return min(paths, key=lambda p: (mtime(p), p))
+
+
+def build_plan(duplicates, action='delete', keep='oldest', preferred_root=None):
+    """
+    Turn duplicate groups into a list of non-interactive actions.
+
+    Args:
+        duplicates (dict): digest -> list of paths, as from find_duplicates().
+        action (str): What to do with each extra copy, one of ACTIONS.
+        keep (str): Keep policy, one of KEEP_POLICIES.
+        preferred_root (str, optional): Directory preferred by the 'root' policy.
+
+    Yields:
+        dict: One action with keys action, keep, target, digest and size.
+        The mtime and [device, inode] of both files are recorded as
+        keep_mtime_ns, keep_inode, mtime_ns and inode so apply_action() can
+        refuse files that changed after planning.
+
+    Raises:
+        ValueError: For near-duplicate image groups ("~" labels), whose
+            files differ and must not be deleted or linked automatically.
+    """
+    for digest, paths in duplicates.items():
+        if digest.startswith('~'):
+            raise ValueError("near-duplicate groups cannot be planned: their files differ")
+        keeper = choose_keeper(paths, keep, preferred_root)
+        try:
+            keep_st = os.stat(keeper)
+        except OSError:
+            continue
+        for path in paths:
+            if path == keeper:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            yield {'action': action, 'keep': keeper, 'target': path, 'digest': digest,
+                   'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                   'inode': [st.st_dev, st.st_ino],
+                   'keep_mtime_ns': keep_st.st_mtime_ns,
+                   'keep_inode': [keep_st.st_dev, keep_st.st_ino]}
+
+
+def write_plan(actions, plan_path):
+    """
+    Write actions to a plan file.
+
+    Files ending in .json get a single JSON array; anything else is written
+    as JSON Lines, one action per line, which can be streamed back.
+
+    Returns:
+        int: Number of actions written.
+    """
+    count = 0
+    with open(plan_path, 'w', encoding='utf-8') as f:
+        if plan_path.endswith('.json'):
+            actions = list(actions)
+            json.dump(actions, f, indent=2)
+            count = len(actions)
+        else:
+            for item in actions:
+                f.write(json.dumps(item) + '\n')
+                count += 1
+    return count
+
+
+def read_plan(plan_path):
+    """Yield actions from a JSON or JSON Lines plan file."""
+    with open(plan_path, 'r', encoding='utf-8') as f:
+        if plan_path.endswith('.json'):
+            yield from json.load(f)
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def reflink(source, destination):
+    """
+    Create `destination` as a copy-on-write clone of `source` (Linux FICLONE).
+
+    Fails if `destination` already exists, and removes it again if the clone
+    cannot be made.
+    """
+    import fcntl
+
+    with open(source, 'rb') as src, open(destination, 'xb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            os.remove(destination)
+            raise
+
+
+def _replace_with(link_func, keep, target):
+    """
+    Atomically replace `target` with a link or clone of `keep`.
+
+    The link is made at "<target>.dedup-tmp" first; a file already at that
+    path is never overwritten or removed.
+    """
+    tmp = f"{target}.dedup-tmp"
+    created = False
+    try:
+        link_func(keep, tmp)
+        created = True
+        os.replace(tmp, target)
+    except OSError:
+        if created:
+            os.remove(tmp)
+        raise
+
+
+def _check_unchanged(path, st, item, prefix=''):
+    """Raise OSError if a file's mtime or inode differ from the plan."""
+    planned = (item.get(prefix + 'mtime_ns'), tuple(item.get(prefix + 'inode') or ()))
+    if planned != (st.st_mtime_ns, (st.st_dev, st.st_ino)):
+        raise OSError(f"changed since planning: {path}")
+
+
+def apply_action(item, dry_run=False):
+    """
+    Apply a single plan action after re-checking that it is still safe.
+
+    Both files must still have the size, mtime and inode recorded in the
+    plan, and their contents are byte-compared again before anything is
+    changed.
+
+    Returns:
+        int: Bytes reclaimed (0 for hardlinks that were already shared).
+
+    Raises:
+        OSError: If the files changed since planning or the operation fails.
+    """
+    keep, target = item['keep'], item['target']
+
+    keep_st = os.stat(keep)
+    target_st = os.stat(target)
+    if keep_st.st_size != item['size'] or target_st.st_size != item['size']:
+        raise OSError(f"size changed since planning: {target}")
+    if (keep_st.st_dev, keep_st.st_ino) == (target_st.st_dev, target_st.st_ino):
+        return 0
+    _check_unchanged(keep, keep_st, item, 'keep_')
+    _check_unchanged(target, target_st, item)
+    if verify_group([keep, target]) != [[keep, target]]:
+        raise OSError(f"content differs from {keep}: {target}")
+
+    # Only the last link to an inode actually frees its blocks
+    reclaimed = item['size'] if target_st.st_nlink == 1 else 0
+    if dry_run:
+        return reclaimed
+
+    if item['action'] == 'delete':
+        os.remove(target)
+    elif item['action'] == 'hardlink':
+        _replace_with(os.link, keep, target)
+    elif item['action'] == 'reflink':
+        _replace_with(reflink, keep, target)
+    else:
+        raise ValueError(f"Unknown action: {item['action']}")
+    return reclaimed
+
+
+def execute_plan(actions, dry_run=False, batch_size=1000):
+    """
+    Apply plan actions in batches and report what was reclaimed.
+
+    Args:
+        actions (iterable): Action dicts, e.g. from read_plan().
+        dry_run (bool): Check every action but change nothing.
+        batch_size (int): Actions per progress report.
+
+    Returns:
+        dict: Counts of applied and failed actions and bytes reclaimed.
+    """
+    summary = {'applied': 0, 'failed': 0, 'bytes_reclaimed': 0}
+    batch = 0
+    for item in actions:
+        try:
+            summary['bytes_reclaimed'] += apply_action(item, dry_run)
+            summary['applied'] += 1
+        except (OSError, ValueError) as e:
+            summary['failed'] += 1
+            print(f"Error: {item['action']} {item['target']}: {e}")
+
+        batch += 1
+        if batch == batch_size:
+            print(f"Processed {summary['applied'] + summary['failed']} actions...")
+            batch = 0
+    return summary
+
+
+def print_summary(summary, dry_run=False):
+    """Print the result of execute_plan()."""
+    mode = " (dry run)" if dry_run else ""
+    print(f"\nActions applied{mode}: {summary['applied']}")
+    print(f"Actions failed: {summary['failed']}")
+    print(f"Bytes reclaimed{mode}: {summary['bytes_reclaimed']} "
+          f"({summary['bytes_reclaimed'] / (1024 ** 3):.2f} GiB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a duplicate cleanup plan written by duplicate_finder.py --plan.")
+    parser.add_argument("plan", help="Plan file (.json or .jsonl).")
+    parser.add_argument("--dry-run", action="store_true", help="Validate every action and report savings without changing files.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Actions per progress report (default: 1000).")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.plan):
+        print(f"Error: {args.plan} is not a valid plan file.")
+        return 1
+
+    summary = execute_plan(read_plan(args.plan), args.dry_run, args.batch_size)
+    print_summary(summary, args.dry_run)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
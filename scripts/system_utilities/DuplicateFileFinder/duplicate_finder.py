@@ -1,12 +1,43 @@
 import os
 import hashlib
 import argparse
+import json
+import sys
 from collections import defaultdict
-from pathlib import Path
 
-def calculate_hash(file_path, block_size=65536):
-    """Calculate the MD5 hash of a file in chunks to handle large files."""
-    hasher = hashlib.md5()
+from byte_verify import VERIFY_CHUNK_SIZE, verify_group
+from hash_index import HashIndex
+from hash_pool import HashingPool
+from dedup_actions import ACTIONS, KEEP_POLICIES, build_plan, write_plan
+from file_table import FileTable
+from near_duplicates import (DEFAULT_THRESHOLD, IMAGE_EXTENSIONS, PERCEPTUAL_HASHES,
+                             Image, group_similar, image_hash, image_size)
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+PARTIAL_BLOCK_SIZE = 4096
+STREAM_BATCH_FILES = 1000
+DEFAULT_BLOCK_SIZE = 65536
+DEFAULT_ALGORITHM = 'md5'
+
+# Cryptographic digests from hashlib; xxh64/xxh3 are added when xxhash is installed.
+HASH_ALGORITHMS = ['md5', 'sha1', 'sha256', 'blake2b']
+FAST_HASH_ALGORITHMS = ['xxh64', 'xxh3_128'] if xxhash is not None else []
+
+def new_hasher(algorithm=DEFAULT_ALGORITHM):
+    """Return a fresh hash object for one of HASH_ALGORITHMS or FAST_HASH_ALGORITHMS."""
+    if algorithm in HASH_ALGORITHMS:
+        return hashlib.new(algorithm)
+    if algorithm in FAST_HASH_ALGORITHMS:
+        return getattr(xxhash, algorithm)()
+    raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+
+def calculate_hash(file_path, block_size=DEFAULT_BLOCK_SIZE, algorithm=DEFAULT_ALGORITHM):
+    """Calculate the digest of a file in chunks to handle large files."""
+    hasher = new_hasher(algorithm)
     try:
         with open(file_path, 'rb') as f:
             for chunk in iter(lambda: f.read(block_size), b''):
@@ -16,44 +47,418 @@ def calculate_hash(file_path, block_size=65536):
         print(f"Error reading {file_path}: {e}")
         return None
 
-def find_duplicates(directory):
-    """Find duplicate files in the given directory and its subdirectories."""
-    size_groups = defaultdict(list)
+def calculate_partial_hash(file_path, size, block_size=PARTIAL_BLOCK_SIZE,
+                           algorithm=DEFAULT_ALGORITHM):
+    """Calculate the digest of only the first and last block of a file."""
+    hasher = new_hasher(algorithm)
+    try:
+        with open(file_path, 'rb') as f:
+            hasher.update(f.read(block_size))
+            if size > block_size:
+                f.seek(max(size - block_size, block_size))
+                hasher.update(f.read(block_size))
+        return hasher.hexdigest()
+    except (OSError, PermissionError) as e:
+        print(f"Error reading {file_path}: {e}")
+        return None
+
+def new_stage_stats():
+    """Return a zeroed counter dict for the staged duplicate filter."""
+    return {
+        'files_scanned': 0,
+        'hardlinks_collapsed': 0,
+        'eliminated_by_size': 0,
+        'eliminated_by_partial': 0,
+        'fully_hashed': 0,
+        'partial_bytes_read': 0,
+        'full_bytes_read': 0,
+        'bytes_avoided': 0,
+        'groups_verified': 0,
+        'verification_splits': 0,
+    }
+
+def _hash_stage(entries, label, func, extra_args, index, pool, pass_size=False):
+    """
+    Digest a list of (path, stat_key, size) entries for one filter stage.
+
+    `func` is called as func(path, *extra_args), or func(path, size,
+    *extra_args) when `pass_size` is set. `label` names the digest in the
+    index. Index lookups and writes happen on the calling thread; only the
+    misses are handed to the pool. Returns (digests, hashed) where `digests` maps path to
+    digest and `hashed` is the set of paths that were actually read.
+    """
+    digests = {}
+    jobs = []
+    for path, key, size in entries:
+        digest = index.lookup(key, label) if index is not None else None
+        if digest:
+            index.touch(key, path, label)
+            digests[path] = digest
+        else:
+            args = (path, size, *extra_args) if pass_size else (path, *extra_args)
+            jobs.append((path, key[0], func, args))
+
+    computed = pool.run(jobs) if pool is not None else {
+        path: func(*args) for path, _, func, args in jobs}
+    for path, key, _ in entries:
+        digest = computed.get(path)
+        if digest:
+            digests[path] = digest
+            if index is not None:
+                index.store(key, digest, path, label)
+    return digests, set(computed)
+
+def resolve_size_groups(size_groups, index=None, stats=None, pool=None,
+                        algorithm=DEFAULT_ALGORITHM, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Resolve groups of same-size files into groups of identical content.
+
+    Files larger than two partial blocks are first compared on a hash of their
+    head and tail blocks; only files that still collide are fully hashed.
+    Each stage covers every group at once so a HashingPool can keep all its
+    workers busy. Group membership and ordering match the serial path.
+
+    Args:
+        size_groups (dict): size -> list of (path, stat_key) tuples.
+        index (HashIndex, optional): Digest cache consulted before reading files.
+        stats (dict, optional): Counters from new_stage_stats() to update.
+        pool (HashingPool, optional): Worker pool used to hash files.
+        algorithm (str): Digest algorithm, see HASH_ALGORITHMS.
+        block_size (int): Read size used for full hashes.
+
+    Returns:
+        dict: Full digest -> list of paths, only for groups of two or more.
+    """
+    if stats is None:
+        stats = new_stage_stats()
+
+    partial_entries = [(path, key, size)
+                       for size, entries in size_groups.items()
+                       if size > 2 * PARTIAL_BLOCK_SIZE
+                       for path, key in entries]
+    partial, hashed = _hash_stage(partial_entries, f'{algorithm}-partial',
+                                  calculate_partial_hash, (PARTIAL_BLOCK_SIZE, algorithm),
+                                  index, pool, pass_size=True)
+    stats['partial_bytes_read'] += 2 * PARTIAL_BLOCK_SIZE * len(hashed)
+
+    candidates = []
+    for size, entries in size_groups.items():
+        if size <= 2 * PARTIAL_BLOCK_SIZE:
+            candidates.extend((path, key, size) for path, key in entries)
+            continue
+        partial_groups = defaultdict(list)
+        for path, key in entries:
+            if path in partial:
+                partial_groups[partial[path]].append((path, key, size))
+        for group in partial_groups.values():
+            if len(group) > 1:
+                candidates.extend(group)
+            else:
+                stats['eliminated_by_partial'] += 1
+                stats['bytes_avoided'] += size - 2 * PARTIAL_BLOCK_SIZE
+
+    full, hashed = _hash_stage(candidates, algorithm, calculate_hash,
+                               (block_size, algorithm), index, pool)
+    stats['fully_hashed'] += len(candidates)
+    stats['full_bytes_read'] += sum(size for path, _, size in candidates if path in hashed)
+
+    hash_groups = defaultdict(list)
+    for path, _, _ in candidates:
+        if path in full:
+            hash_groups[full[path]].append(path)
+
+    # Filter out groups with only one path (not real duplicates)
+    return {h: paths for h, paths in hash_groups.items() if len(paths) > 1}
+
+def confirm_size_group(size, entries, index=None, stats=None, pool=None,
+                       algorithm=DEFAULT_ALGORITHM, block_size=DEFAULT_BLOCK_SIZE):
+    """Resolve a single group of same-size files; see resolve_size_groups()."""
+    return resolve_size_groups({size: entries}, index, stats, pool, algorithm, block_size)
+
+def scan_files(directory):
+    """
+    Yield (dirpath, name, stat_result, is_symlink) for every regular file
+    under `directory`.
+
+    Uses an explicit os.scandir stack so file type checks come from the
+    directory listing itself and each file costs a single stat() call.
+    Symlinked directories are not followed, matching os.walk.
+    """
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            yield current, entry.name, entry.stat(), entry.is_symlink()
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+def scan_distinct_files(directory, stats=None):
+    """
+    Yield (dirpath, name, stat_result) for every distinct file under `directory`.
+
+    Paths that resolve to the same (st_dev, st_ino) as a file already seen
+    (extra hardlinks, or symlinks to a scanned file) are skipped so the same
+    bytes are never hashed twice or offered for deletion.
+    """
+    if stats is None:
+        stats = new_stage_stats()
+    seen_inodes = set()
+    for root, name, st, is_link in scan_files(directory):
+        # Only multiply-linked files and symlink targets can be seen twice
+        if st.st_nlink > 1 or is_link:
+            inode = (st.st_dev, st.st_ino)
+            if inode in seen_inodes:
+                stats['hardlinks_collapsed'] += 1
+                continue
+            seen_inodes.add(inode)
+        yield root, name, st
+
+def scan_table(directory, stats=None):
+    """
+    First pass: record every file in a compact FileTable, collapsing hardlinks
+    as scan_distinct_files() does.
+
+    Returns:
+        FileTable: One entry per distinct file.
+    """
+    if stats is None:
+        stats = new_stage_stats()
+    table = FileTable()
+    for root, name, st in scan_distinct_files(directory, stats):
+        table.add(root, name, st.st_size, st.st_dev, st.st_ino, st.st_mtime_ns)
+
+    stats['files_scanned'] = len(table)
+    return table
+
+def print_stage_stats(stats):
+    """Print how many files each filter stage eliminated and the bytes saved."""
+    print("\nDuplicate filter stages:")
+    print(f"  Files scanned:              {stats['files_scanned']}")
+    print(f"  Hardlinks collapsed:        {stats['hardlinks_collapsed']}")
+    print(f"  Eliminated by size:         {stats['eliminated_by_size']}")
+    print(f"  Eliminated by head/tail:    {stats['eliminated_by_partial']}")
+    print(f"  Fully hashed:               {stats['fully_hashed']}")
+    print(f"  Bytes read (partial/full):  {stats['partial_bytes_read']} / {stats['full_bytes_read']}")
+    print(f"  Bytes avoided:              {stats['bytes_avoided']}")
+    if stats['groups_verified']:
+        print(f"  Groups byte-verified:       {stats['groups_verified']}")
+        print(f"  Groups split on verify:     {stats['verification_splits']}")
+
+def verify_duplicates(duplicates, stats=None, chunk_size=VERIFY_CHUNK_SIZE):
+    """
+    Byte-verify every hash group and drop or split groups that differ.
+
+    A group that splits on verification (a hash collision) is kept under
+    "<digest>-<n>" keys, one per identical subgroup.
+    """
+    if stats is None:
+        stats = new_stage_stats()
+    verified = {}
+    for digest, paths in duplicates.items():
+        groups = verify_group(paths, chunk_size)
+        stats['groups_verified'] += 1
+        if len(groups) == 1 and len(groups[0]) == len(paths):
+            verified[digest] = groups[0]
+            continue
+        stats['verification_splits'] += 1
+        for n, group in enumerate(groups, 1):
+            verified[f"{digest}-{n}"] = group
+    return verified
+
+def _candidate_groups(directory, stats):
+    """
+    Run the first pass and yield (size, entries) for sizes shared by 2+ files.
+
+    Entries are only built for colliding files; everything else stays in the
+    compact table and is counted as eliminated by size.
+    """
+    table = scan_table(directory, stats)
+    stats['eliminated_by_size'] = len(table)
+    for size, entries in table.iter_size_collisions():
+        stats['eliminated_by_size'] -= len(entries)
+        yield size, entries
+
+def iter_resolved_groups(buckets, index=None, stats=None, pool=None,
+                         algorithm=DEFAULT_ALGORITHM, block_size=DEFAULT_BLOCK_SIZE,
+                         verify=False, batch_files=STREAM_BATCH_FILES):
+    """
+    Resolve size buckets a batch at a time and yield confirmed duplicate groups.
+
+    `buckets` is any iterable of (size, [(path, stat_key), ...]) pairs and is
+    consumed lazily, so only the current batch is held in memory and no
+    global hash table is built. Each batch holds about `batch_files` files,
+    enough to keep a HashingPool busy.
+
+    Yields:
+        tuple: (digest, paths) for every group of two or more identical files.
+    """
+    if stats is None:
+        stats = new_stage_stats()
+    batch, count = {}, 0
+    for size, entries in buckets:
+        batch[size] = entries
+        count += len(entries)
+        if count >= batch_files:
+            yield from _resolve_batch(batch, index, stats, pool, algorithm, block_size, verify)
+            batch, count = {}, 0
+    if batch:
+        yield from _resolve_batch(batch, index, stats, pool, algorithm, block_size, verify)
+
+def _resolve_batch(batch, index, stats, pool, algorithm, block_size, verify):
+    """Resolve one batch of size buckets for iter_resolved_groups()."""
+    duplicates = resolve_size_groups(batch, index, stats, pool, algorithm, block_size)
+    if verify:
+        duplicates = verify_duplicates(duplicates, stats)
+    if index is not None:
+        index.conn.commit()
+    return duplicates.items()
+
+def iter_duplicates(directory, index=None, stats=None, pool=None,
+                    algorithm=DEFAULT_ALGORITHM, block_size=DEFAULT_BLOCK_SIZE,
+                    verify=False, batch_files=STREAM_BATCH_FILES):
+    """
+    Generator version of find_duplicates() that prints nothing.
+
+    The directory is walked once to find size collisions, then groups are
+    yielded as soon as their size bucket is resolved instead of after the
+    whole tree has been hashed.
+
+    Yields:
+        tuple: (digest, paths) for every group of two or more identical files.
+    """
+    if stats is None:
+        stats = new_stage_stats()
+    yield from iter_resolved_groups(_candidate_groups(directory, stats), index, stats,
+                                    pool, algorithm, block_size, verify, batch_files)
+
+def find_duplicates(directory, index=None, stats=None, pool=None,
+                    algorithm=DEFAULT_ALGORITHM, block_size=DEFAULT_BLOCK_SIZE,
+                    verify=False):
+    """
+    Find duplicate files in the given directory and its subdirectories.
+
+    Candidates are narrowed in stages: file size, then a hash of the head and
+    tail blocks, then a full hash of the survivors using `algorithm`. If a
+    HashIndex is given, files whose (device, inode, size, mtime) are already
+    known reuse the stored digest instead of being read again. Pass a dict from
+    new_stage_stats() as `stats` to receive the per-stage counters, and a
+    HashingPool as `pool` to hash files in parallel. With `verify`, every
+    reported group is also byte-compared so results do not rely on the
+    digest being collision free.
+    """
+    if stats is None:
+        stats = new_stage_stats()
     
     print(f"Scanning directory: {directory}")
     
     # First pass: Group files by size to avoid hashing unique files
-    for root, _, files in os.walk(directory):
-        for filename in files:
-            path = Path(root) / filename
-            try:
-                if path.is_file():
-                    size = path.stat().st_size
-                    size_groups[size].append(str(path))
-            except (OSError, PermissionError):
-                continue
-
-    # Second pass: Hash only files that share the same size
-    hash_groups = defaultdict(list)
-    potential_duplicates = [paths for size, paths in size_groups.items() if len(paths) > 1]
+    potential_duplicates = dict(_candidate_groups(directory, stats))
     
-    total_potential = sum(len(p) for p in potential_duplicates)
+    total_potential = sum(len(p) for p in potential_duplicates.values())
     if total_potential == 0:
         print("No duplicates found (all files have unique sizes).")
         return {}
 
     print(f"Checking {total_potential} files with common sizes for content matches...")
     
-    for paths in potential_duplicates:
-        for path in paths:
-            file_hash = calculate_hash(path)
-            if file_hash:
-                hash_groups[file_hash].append(path)
+    # Second pass: Hash only files that share the same size
+    duplicates = resolve_size_groups(potential_duplicates, index, stats, pool,
+                                     algorithm, block_size)
+    if verify:
+        duplicates = verify_duplicates(duplicates, stats)
+
+    if index is not None:
+        index.conn.commit()
+        print(f"Hash index: {index.hits} reused, {index.misses} hashed.")
+    print_stage_stats(stats)
 
-    # Filter out groups with only one path (not real duplicates)
-    duplicates = {h: paths for h, paths in hash_groups.items() if len(paths) > 1}
     return duplicates
 
+def find_similar_images(directory, algorithm='dhash', threshold=DEFAULT_THRESHOLD, pool=None):
+    """
+    Find near-duplicate images (re-encoded, resized or recompressed copies).
+
+    Every image under `directory` gets a 64-bit perceptual hash (aHash, dHash
+    or pHash, via Pillow). Hashes are indexed in a BK-tree so each image is
+    only compared with candidates inside the Hamming radius `threshold`.
+    Hardlinks to one image are collapsed as in find_duplicates().
+
+    Returns:
+        dict: "~<hash>" label -> list of paths, one entry per similar group.
+        The files in a group differ, so groups are for review only.
+    """
+    if Image is None:
+        print("Error: Pillow is required for near-duplicate detection (pip install Pillow).")
+        return {}
+
+    print(f"Scanning directory for images: {directory}")
+    images = [(os.path.join(root, name), st.st_dev)
+              for root, name, st in scan_distinct_files(directory)
+              if name.lower().endswith(IMAGE_EXTENSIONS)]
+    paths = [path for path, _ in images]
+    print(f"Computing {algorithm} for {len(paths)} images...")
+
+    jobs = [(path, device, image_hash, (path, algorithm)) for path, device in images]
+    hashes = pool.run(jobs) if pool is not None else {
+        path: image_hash(path, algorithm) for path in paths}
+
+    groups = group_similar(((p, hashes[p]) for p in paths if hashes.get(p) is not None), threshold)
+    return {f"~{hashes[group[0]]:016x}": group for group in groups}
+
+def stream_groups(directory, output, **options):
+    """
+    Write duplicate groups as JSON Lines while the scan is still running.
+
+    Each line is {"digest", "size", "paths"} and is flushed immediately so a
+    downstream consumer can start on the first groups right away.
+
+    Args:
+        directory (str): Directory to scan.
+        output (str): Output file, or '-' for stdout.
+        **options: Passed to iter_duplicates().
+
+    Returns:
+        int: Number of groups written.
+    """
+    out = sys.stdout if output == '-' else open(output, 'w', encoding='utf-8')
+    count = 0
+    try:
+        for digest, paths in iter_duplicates(directory, **options):
+            size = os.path.getsize(paths[0])
+            out.write(json.dumps({'digest': digest, 'size': size, 'paths': paths}) + '\n')
+            out.flush()
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return count
+
+def report_similar(groups):
+    """
+    Print near-duplicate image groups, largest resolution first.
+
+    Nothing is deleted: the images in a group differ, so which copy to keep
+    is left to the user.
+    """
+    if not groups:
+        print("No similar images found.")
+        return
+
+    print(f"\nFound {len(groups)} groups of similar images (review only, nothing is changed).")
+    for i, (label, paths) in enumerate(groups.items(), 1):
+        print(f"\nGroup {i} ({label}):")
+        for path, (width, height) in sorted(((p, image_size(p)) for p in paths),
+                                            key=lambda item: -item[1][0] * item[1][1]):
+            print(f"  {width}x{height}  {os.path.getsize(path):>10} bytes  {path}")
+
 def handle_duplicates(duplicates):
     """Interactively manage duplicate files."""
     if not duplicates:
@@ -63,7 +468,7 @@ def handle_duplicates(duplicates):
     print(f"\nFound {len(duplicates)} groups of duplicate files.")
     
     for i, (file_hash, paths) in enumerate(duplicates.items(), 1):
-        print(f"\nGroup {i} (MD5: {file_hash}):")
+        print(f"\nGroup {i} (Hash: {file_hash}):")
         for idx, path in enumerate(paths, 1):
             print(f"  [{idx}] {path}")
         
@@ -114,14 +519,67 @@ def handle_duplicates(duplicates):
 def main():
     parser = argparse.ArgumentParser(description="Find and manage duplicate files in a directory.")
     parser.add_argument("directory", help="The directory to scan for duplicates.")
+    parser.add_argument("--index", help="Path to a persistent hash index; unchanged files are not re-hashed.")
+    parser.add_argument("-a", "--algorithm", default=DEFAULT_ALGORITHM,
+                        choices=HASH_ALGORITHMS + FAST_HASH_ALGORITHMS,
+                        help=f"Digest algorithm (default: {DEFAULT_ALGORITHM}).")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE,
+                        help=f"Read size in bytes for full hashes (default: {DEFAULT_BLOCK_SIZE}).")
+    parser.add_argument("--verify", action="store_true", help="Byte-compare every group after hashing.")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="Number of parallel hashing workers (default: 1, serial).")
+    parser.add_argument("--processes", action="store_true", help="Hash in worker processes instead of threads.")
+    parser.add_argument("--per-device", type=int, help="Max concurrent reads per device (spinning disks are always limited to 1).")
+    parser.add_argument("--plan", help="Write a non-interactive action plan (.json or .jsonl) instead of prompting; apply it with dedup_actions.py.")
+    parser.add_argument("--action", choices=ACTIONS, default="delete", help="Planned action for extra copies (default: delete).")
+    parser.add_argument("--keep", choices=KEEP_POLICIES, default="oldest", help="Which copy the plan keeps (default: oldest).")
+    parser.add_argument("--preferred-root", help="Directory whose copies are kept by --keep root.")
+    parser.add_argument("--jsonl", metavar="FILE", help="Stream duplicate groups as JSON Lines to FILE ('-' for stdout) as soon as each is confirmed.")
+    parser.add_argument("--similar", action="store_true", help="Find near-duplicate images by perceptual hash instead of exact duplicates (requires Pillow).")
+    parser.add_argument("--image-hash", choices=PERCEPTUAL_HASHES, default="dhash", help="Perceptual hash for --similar (default: dhash).")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help=f"Max differing bits for --similar matches (default: {DEFAULT_THRESHOLD}).")
+    parser.add_argument("--compact", action="store_true", help="Remove index entries for files that are gone or changed.")
     args = parser.parse_args()
+    if args.similar and args.plan:
+        parser.error("--plan cannot be used with --similar: near-duplicate images differ, so they are only reported")
 
     target_dir = os.path.abspath(args.directory)
     if not os.path.isdir(target_dir):
         print(f"Error: {target_dir} is not a valid directory.")
         return
 
-    duplicates = find_duplicates(target_dir)
+    pool = None
+    if args.workers > 1:
+        pool = HashingPool(workers=args.workers, use_processes=args.processes,
+                           per_device=args.per_device)
+
+    index = HashIndex(args.index) if args.index else None
+    try:
+        if index is not None and args.compact:
+            removed = index.compact()
+            print(f"Compacted hash index: removed {removed} stale entries.")
+        if args.similar:
+            report_similar(find_similar_images(target_dir, args.image_hash, args.threshold, pool))
+            return
+        elif args.jsonl:
+            stream_groups(target_dir, args.jsonl, index=index, pool=pool,
+                          algorithm=args.algorithm, block_size=args.block_size,
+                          verify=args.verify)
+            return
+        else:
+            duplicates = find_duplicates(target_dir, index=index, pool=pool,
+                                         algorithm=args.algorithm, block_size=args.block_size,
+                                         verify=args.verify)
+    finally:
+        if index is not None:
+            index.close()
+        if pool is not None:
+            pool.close()
+
+    if args.plan:
+        actions = build_plan(duplicates, args.action, args.keep, args.preferred_root)
+        count = write_plan(actions, args.plan)
+        print(f"Wrote {count} actions for {len(duplicates)} groups to {args.plan}")
+        return
     handle_duplicates(duplicates)
 
 if __name__ == "__main__":
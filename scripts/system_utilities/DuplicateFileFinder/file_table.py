@@ -0,0 +1,78 @@
+import heapq
+import itertools
+import os
+from array import array
+
+# Files sorted per run while finding size collisions; bounds the temporary
+# Python objects the sort needs, independent of the table size.
+SORT_RUN = 65536
+
+
+class FileTable:
+    """
+    Compact, array-backed record of scanned files.
+
+    Instead of one Python string and tuple per file, each file is an integer
+    id into parallel typed arrays. Directory paths are interned once and file
+    names are packed into a single byte buffer, which brings the cost of a
+    scanned file down to a few dozen bytes. Full paths are only rebuilt for
+    the files that actually share a size with another file.
+    """
+
+    def __init__(self):
+        self._dir_ids = {}
+        self.dirs = []
+        self.dir_of = array('I')
+        self._names = bytearray()
+        self._name_offsets = array('Q', [0])
+        self.sizes = array('Q')
+        self.devs = array('Q')
+        self.inos = array('Q')
+        self.mtimes = array('q')
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def add(self, directory, name, size, dev, ino, mtime_ns):
+        """Append one file and return its integer id."""
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = self._dir_ids[directory] = len(self.dirs)
+            self.dirs.append(directory)
+        self.dir_of.append(dir_id)
+        self._names += name.encode('utf-8', 'surrogateescape')
+        self._name_offsets.append(len(self._names))
+        self.sizes.append(size)
+        self.devs.append(dev)
+        self.inos.append(ino)
+        self.mtimes.append(mtime_ns)
+        return len(self.sizes) - 1
+
+    def path(self, file_id):
+        """Rebuild the full path of a file id."""
+        start, end = self._name_offsets[file_id], self._name_offsets[file_id + 1]
+        name = self._names[start:end].decode('utf-8', 'surrogateescape')
+        return os.path.join(self.dirs[self.dir_of[file_id]], name)
+
+    def stat_key(self, file_id):
+        """Return the (device, inode, size, mtime_ns) key of a file id."""
+        return (self.devs[file_id], self.inos[file_id],
+                self.sizes[file_id], self.mtimes[file_id])
+
+    def iter_size_collisions(self):
+        """
+        Yield (size, [(path, stat_key), ...]) for every size shared by 2+ files.
+
+        File ids are sorted by size in runs of SORT_RUN into typed arrays,
+        and the runs are merged lazily, so the sort never holds more than one
+        run of Python objects at a time. Entries are only materialised for
+        collisions.
+        """
+        total = len(self.sizes)
+        key = self.sizes.__getitem__
+        runs = [array('Q', sorted(range(start, min(start + SORT_RUN, total)), key=key))
+                for start in range(0, total, SORT_RUN)]
+        for size, ids in itertools.groupby(heapq.merge(*runs, key=key), key=key):
+            ids = array('Q', ids)
+            if len(ids) > 1:
+                yield size, [(self.path(i), self.stat_key(i)) for i in sorted(ids)]
@@ -0,0 +1,84 @@
+import os
+import time
+import argparse
+import tempfile
+
+from duplicate_finder import (FAST_HASH_ALGORITHMS, HASH_ALGORITHMS,
+                              calculate_hash)
+
+DEFAULT_BLOCK_SIZES = [16384, 65536, 262144, 1048576]
+
+
+def create_synthetic_file(path, size_mb):
+    """Write `size_mb` MiB of random data to `path`."""
+    chunk = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(chunk)
+
+
+def benchmark(path, algorithms, block_sizes, repeat=3):
+    """
+    Measure hashing throughput for each algorithm and block size.
+
+    The file is read once before timing so every run hits the page cache and
+    the numbers reflect digest speed rather than disk speed. The best of
+    `repeat` runs is kept.
+
+    Returns:
+        list: (algorithm, block_size, mb_per_second) tuples.
+    """
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    calculate_hash(path)
+
+    results = []
+    for algorithm in algorithms:
+        for block_size in block_sizes:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                calculate_hash(path, block_size=block_size, algorithm=algorithm)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results.append((algorithm, block_size, size_mb / best))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark digest algorithms and block sizes for duplicate_finder.py.")
+    parser.add_argument("--size", type=int, default=256, help="Size of the synthetic file in MiB (default: 256).")
+    parser.add_argument("--block-sizes", type=int, nargs='+', default=DEFAULT_BLOCK_SIZES,
+                        help="Block sizes in bytes to try.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per combination; the best is kept (default: 3).")
+    parser.add_argument("--dir", help="Directory for the synthetic file (default: system temp dir).")
+    args = parser.parse_args()
+
+    algorithms = HASH_ALGORITHMS + FAST_HASH_ALGORITHMS
+    if not FAST_HASH_ALGORITHMS:
+        print("xxhash not installed; skipping non-cryptographic hashes (pip install xxhash).")
+
+    fd, path = tempfile.mkstemp(suffix='.bin', dir=args.dir)
+    os.close(fd)
+    try:
+        print(f"Creating {args.size} MiB synthetic file at {path}...")
+        create_synthetic_file(path, args.size)
+        results = benchmark(path, algorithms, args.block_sizes, args.repeat)
+    finally:
+        os.remove(path)
+
+    print(f"\n{'Algorithm':<12}{'Block size':>12}{'MB/s':>12}")
+    print("-" * 36)
+    for algorithm, block_size, speed in results:
+        print(f"{algorithm:<12}{block_size:>12}{speed:>12.1f}")
+
+    fastest = max(results, key=lambda r: r[2])
+    print(f"\nFastest: --algorithm {fastest[0]} --block-size {fastest[1]} ({fastest[2]:.1f} MB/s)")
+    safe = [r for r in results if r[0] in HASH_ALGORITHMS]
+    fastest_safe = max(safe, key=lambda r: r[2])
+    if fastest_safe is not fastest:
+        print(f"Fastest cryptographic: --algorithm {fastest_safe[0]} --block-size {fastest_safe[1]} "
+              f"({fastest_safe[2]:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
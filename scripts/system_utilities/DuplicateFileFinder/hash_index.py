@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import time
+
+
+class HashIndex:
+    """
+    Persistent on-disk cache of file digests for incremental rescans.
+
+    Entries are keyed by (device, inode, size, mtime_ns) so a file that has
+    not been touched since the last scan is never read again, even if it was
+    renamed or moved within the same filesystem. The index is a single SQLite
+    file, which keeps lookups fast on shares with millions of files.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS digests (
+            dev INTEGER NOT NULL,
+            ino INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            algorithm TEXT NOT NULL,
+            digest TEXT NOT NULL,
+            path TEXT NOT NULL,
+            last_seen REAL NOT NULL,
+            PRIMARY KEY (dev, ino, size, mtime_ns, algorithm)
+        )
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.conn = sqlite3.connect(index_path)
+        self.conn.execute(self.SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, stat_key, algorithm='md5'):
+        """Return the cached digest for a stat key, or None if it is unknown."""
+        row = self.conn.execute(
+            "SELECT digest FROM digests WHERE dev=? AND ino=? AND size=? "
+            "AND mtime_ns=? AND algorithm=?",
+            (*stat_key, algorithm),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def store(self, stat_key, digest, path, algorithm='md5'):
+        """Record the digest of a file under its stat key."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (*stat_key, algorithm, digest, str(path), time.time()),
+        )
+
+    def touch(self, stat_key, path, algorithm='md5'):
+        """Refresh the path and last-seen time of an entry that was reused."""
+        self.conn.execute(
+            "UPDATE digests SET path=?, last_seen=? WHERE dev=? AND ino=? "
+            "AND size=? AND mtime_ns=? AND algorithm=?",
+            (str(path), time.time(), *stat_key, algorithm),
+        )
+
+    def compact(self):
+        """
+        Drop entries whose files are gone or have changed since they were hashed.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        stale = []
+        rows = self.conn.execute(
+            "SELECT dev, ino, size, mtime_ns, path FROM digests"
+        ).fetchall()
+        for dev, ino, size, mtime_ns, path in rows:
+            try:
+                st = os.stat(path)
+            except OSError:
+                stale.append((dev, ino, size, mtime_ns))
+                continue
+            if stat_key(st) != (dev, ino, size, mtime_ns):
+                stale.append((dev, ino, size, mtime_ns))
+
+        self.conn.executemany(
+            "DELETE FROM digests WHERE dev=? AND ino=? AND size=? AND mtime_ns=?",
+            stale,
+        )
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+        return len(stale)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+
+    def close(self):
+        """Flush pending writes and close the index file."""
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def stat_key(st):
+    """Build the (device, inode, size, mtime_ns) index key from an os.stat result."""
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
@@ -0,0 +1,132 @@
+import os
+from collections import defaultdict, deque
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+
+def is_rotational(device):
+    """
+    Return True if a st_dev number belongs to a spinning disk (Linux only).
+
+    Looks up /sys/dev/block/<major>:<minor>/queue/rotational, falling back to
+    the parent disk for partitions. Returns False when the device is unknown,
+    e.g. network filesystems or non-Linux systems.
+    """
+    base = f"/sys/dev/block/{os.major(device)}:{os.minor(device)}"
+    for candidate in (os.path.join(base, "queue", "rotational"),
+                      os.path.join(base, "..", "queue", "rotational")):
+        try:
+            with open(candidate) as f:
+                return f.read().strip() == "1"
+        except OSError:
+            continue
+    return False
+
+
+class HashingPool:
+    """
+    Bounded worker pool for hashing many files concurrently.
+
+    At most `max_in_flight` jobs are queued in the executor at any time, and
+    no device gets more than its concurrency limit, so a slow spinning disk
+    is read sequentially while SSDs and network shares are kept busy.
+    With workers <= 1 jobs run inline on the calling thread.
+
+    The executor is started on the first run() and reused by later calls
+    until close(); the pool can also be used as a context manager.
+    """
+
+    def __init__(self, workers=os.cpu_count() or 4, use_processes=False,
+                 per_device=None, rotational_limit=1, max_in_flight=None):
+        """
+        Args:
+            workers (int): Number of worker threads or processes.
+            use_processes (bool): Use a process pool instead of threads.
+            per_device (int, optional): Max concurrent jobs per device
+                (default: no limit beyond `workers`).
+            rotational_limit (int): Max concurrent jobs on a spinning disk.
+            max_in_flight (int, optional): Max submitted but unfinished jobs
+                (default: 2 * workers).
+        """
+        self.workers = workers
+        self.use_processes = use_processes
+        self.per_device = per_device or workers
+        self.rotational_limit = rotational_limit
+        self.max_in_flight = max_in_flight or 2 * workers
+        self._device_limits = {}
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shut down the worker threads or processes, if any were started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def device_limit(self, device):
+        """Return the concurrency limit for a device, detecting spinning disks once."""
+        if device not in self._device_limits:
+            limit = self.per_device
+            if is_rotational(device):
+                limit = min(limit, self.rotational_limit)
+            self._device_limits[device] = max(1, limit)
+        return self._device_limits[device]
+
+    def run(self, jobs):
+        """
+        Run hashing jobs and collect their results.
+
+        Args:
+            jobs (iterable): (key, device, func, args) tuples. `func(*args)` is
+                called in a worker and its return value stored under `key`.
+
+        Returns:
+            dict: key -> result of the job.
+        """
+        if self.workers <= 1:
+            return {key: func(*args) for key, _, func, args in jobs}
+
+        queues = defaultdict(deque)
+        for key, device, func, args in jobs:
+            queues[device].append((key, func, args))
+
+        if self._executor is None:
+            executor_cls = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = executor_cls(max_workers=self.workers)
+        results = {}
+        active = defaultdict(int)
+        futures = {}
+        try:
+            while queues or futures:
+                # Round-robin over devices so one busy disk cannot starve the rest
+                submitted = True
+                while submitted and len(futures) < self.max_in_flight:
+                    submitted = False
+                    for device in list(queues):
+                        if len(futures) >= self.max_in_flight:
+                            break
+                        if active[device] >= self.device_limit(device):
+                            continue
+                        key, func, args = queues[device].popleft()
+                        if not queues[device]:
+                            del queues[device]
+                        futures[self._executor.submit(func, *args)] = (key, device)
+                        active[device] += 1
+                        submitted = True
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, device = futures.pop(future)
+                    active[device] -= 1
+                    results[key] = future.result()
+        finally:
+            # A failed job leaves no work behind in the shared executor
+            for future in futures:
+                future.cancel()
+            wait(futures)
+        return results
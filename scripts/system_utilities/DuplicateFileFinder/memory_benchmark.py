@@ -0,0 +1,105 @@
+import os
+import random
+import argparse
+import tracemalloc
+from collections import defaultdict
+from functools import partial
+
+from duplicate_finder import scan_files
+from file_table import FileTable
+
+
+def synthetic_files(count, files_per_dir=200, seed=0):
+    """Yield (dirpath, name, size, dev, ino, mtime_ns) for a fake directory tree."""
+    rng = random.Random(seed)
+    for i in range(count):
+        d = i // files_per_dir
+        directory = f"/mnt/share/projects/team{d % 50:02d}/dataset{d:06d}/raw"
+        yield (directory, f"capture_{i:09d}.dat", rng.randrange(1, 1 << 30),
+               2049, 1000000 + i, 1700000000000000000 + i)
+
+
+def real_files(directory):
+    """Yield the same tuples as synthetic_files() for a real directory."""
+    for root, name, st, _ in scan_files(directory):
+        yield root, name, st.st_size, st.st_dev, st.st_ino, st.st_mtime_ns
+
+
+def build_dict_index(files):
+    """The original first-pass layout: size -> list of (path, stat_key)."""
+    size_groups = defaultdict(list)
+    for directory, name, size, dev, ino, mtime in files:
+        size_groups[size].append((os.path.join(directory, name), (dev, ino, size, mtime)))
+    return size_groups
+
+
+def build_table_index(files):
+    """The compact layout used by find_duplicates()."""
+    table = FileTable()
+    for directory, name, size, dev, ino, mtime in files:
+        table.add(directory, name, size, dev, ino, mtime)
+    return table
+
+
+def dict_collisions(size_groups):
+    """Yield size collisions from the dict layout, as find_duplicates() did."""
+    for size, entries in size_groups.items():
+        if len(entries) > 1:
+            yield size, entries
+
+
+def table_collisions(table):
+    return table.iter_size_collisions()
+
+
+def measure(builder, collisions, files):
+    """
+    Build an index and walk its size collisions under tracemalloc.
+
+    Returns:
+        tuple: (bytes retained after the build, peak bytes during the build
+        and the collision pass, number of files)
+    """
+    files = list(files)
+    tracemalloc.start()
+    index = builder(iter(files))
+    retained, _ = tracemalloc.get_traced_memory()
+    for _ in collisions(index):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del index
+    return retained, peak, len(files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory per scanned file for the dict and FileTable size indexes.")
+    parser.add_argument("--files", type=int, default=500000, help="Number of synthetic files (default: 500000).")
+    parser.add_argument("--dir", help="Scan a real directory instead of generating synthetic files.")
+    args = parser.parse_args()
+
+    if args.dir:
+        source = partial(real_files, args.dir)
+        print(f"Scanning {args.dir}...")
+    else:
+        source = partial(synthetic_files, args.files)
+        print(f"Generating {args.files} synthetic files...")
+
+    before, before_peak, count = measure(build_dict_index, dict_collisions, source())
+    after, after_peak, _ = measure(build_table_index, table_collisions, source())
+    if count == 0:
+        print("No files found.")
+        return
+
+    print(f"\n{'Layout':<28}{'Total MiB':>12}{'Bytes/file':>12}{'Peak MiB':>12}{'Peak B/file':>13}")
+    print("-" * 77)
+    for label, retained, peak in (('defaultdict(list) (before)', before, before_peak),
+                                  ('FileTable (after)', after, after_peak)):
+        print(f"{label:<28}{retained / 2**20:>12.1f}{retained / count:>12.1f}"
+              f"{peak / 2**20:>12.1f}{peak / count:>13.1f}")
+    print(f"\nReduction: {before / max(after, 1):.1f}x retained, "
+          f"{before_peak / max(after_peak, 1):.1f}x peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import math
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tif', '.tiff', '.webp')
+PERCEPTUAL_HASHES = ['ahash', 'dhash', 'phash']
+DEFAULT_THRESHOLD = 6
+
+# Pillow refuses images above its pixel limit with an error that is neither
+# OSError nor ValueError; such files are skipped like unreadable ones
+READ_ERRORS = (OSError, ValueError)
+if Image is not None:
+    READ_ERRORS += (Image.DecompressionBombError,)
+
+
+def _load_gray(file_path, width, height):
+    """Open an image and return its grayscale pixels resized to width x height."""
+    if Image is None:
+        raise ImportError("Pillow is required for near-duplicate detection (pip install Pillow).")
+    with Image.open(file_path) as img:
+        # Let the JPEG decoder downscale while decoding, which is much faster
+        img.draft('L', (width * 4, height * 4))
+        img = img.convert('L').resize((width, height), Image.LANCZOS)
+        return list(img.tobytes())
+
+
+def _bits_to_int(bits):
+    value = 0
+    for bit in bits:
+        value = (value << 1) | bit
+    return value
+
+
+def average_hash(file_path, hash_size=8):
+    """aHash: one bit per pixel of an 8x8 thumbnail, set if above the mean."""
+    pixels = _load_gray(file_path, hash_size, hash_size)
+    mean = sum(pixels) / len(pixels)
+    return _bits_to_int(1 if p > mean else 0 for p in pixels)
+
+
+def difference_hash(file_path, hash_size=8):
+    """dHash: one bit per horizontal gradient of a 9x8 thumbnail."""
+    pixels = _load_gray(file_path, hash_size + 1, hash_size)
+    width = hash_size + 1
+    return _bits_to_int(
+        1 if pixels[row * width + col] > pixels[row * width + col + 1] else 0
+        for row in range(hash_size)
+        for col in range(hash_size)
+    )
+
+
+def _dct_matrix(n, keep):
+    """First `keep` rows of the (unnormalised) DCT-II basis of size n."""
+    return [[math.cos(math.pi * (2 * x + 1) * u / (2 * n)) for x in range(n)]
+            for u in range(keep)]
+
+
+_DCT_32_8 = _dct_matrix(32, 8)
+
+
+def perceptual_hash(file_path, hash_size=8, highfreq_factor=4):
+    """
+    pHash: sign of the low-frequency DCT coefficients against their median.
+
+    Only the hash_size x hash_size low-frequency block of the 2-D DCT is
+    computed, so the cost is two small matrix products rather than a full DCT.
+    """
+    n = hash_size * highfreq_factor
+    matrix = _DCT_32_8 if (n, hash_size) == (32, 8) else _dct_matrix(n, hash_size)
+    pixels = _load_gray(file_path, n, n)
+    rows = [pixels[i * n:(i + 1) * n] for i in range(n)]
+
+    # D * P * D^T restricted to the low-frequency rows and columns
+    partial = [[sum(c * row[x] for c, row in zip(basis, rows)) for x in range(n)]
+               for basis in matrix]
+    coeffs = [sum(b * v for b, v in zip(basis, line)) for line in partial for basis in matrix]
+
+    median = sorted(coeffs[1:])[len(coeffs[1:]) // 2]
+    return _bits_to_int(1 if c > median else 0 for c in coeffs)
+
+
+HASH_FUNCTIONS = {
+    'ahash': average_hash,
+    'dhash': difference_hash,
+    'phash': perceptual_hash,
+}
+
+
+def image_hash(file_path, algorithm='dhash'):
+    """Compute a 64-bit perceptual hash, or None if the image cannot be read."""
+    try:
+        return HASH_FUNCTIONS[algorithm](file_path)
+    except READ_ERRORS as e:
+        print(f"Error reading image {file_path}: {e}")
+        return None
+
+
+def image_size(file_path):
+    """Return (width, height) of an image, or (0, 0) if it cannot be read."""
+    try:
+        with Image.open(file_path) as img:
+            return img.size
+    except READ_ERRORS:
+        return 0, 0
+
+
+def hamming_distance(a, b):
+    """Number of differing bits between two integer hashes."""
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes with Hamming distance.
+
+    Each child edge is labelled with its distance from the parent, so a radius
+    query only descends into edges within [d - radius, d + radius] of the
+    query's distance d. For small radii this visits a small fraction of the
+    tree, keeping near-duplicate search well below quadratic.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, value, item):
+        """Insert a hash with an associated item (e.g. a file path)."""
+        self.size += 1
+        if self.root is None:
+            self.root = (value, [item], {})
+            return
+        node = self.root
+        while True:
+            node_value, items, children = node
+            distance = hamming_distance(value, node_value)
+            if distance == 0:
+                items.append(item)
+                return
+            child = children.get(distance)
+            if child is None:
+                children[distance] = (value, [item], {})
+                return
+            node = child
+
+    def query(self, value, radius):
+        """Return (distance, item) pairs for every hash within `radius` of `value`."""
+        results = []
+        if self.root is None:
+            return results
+        stack = [self.root]
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = hamming_distance(value, node_value)
+            if distance <= radius:
+                results.extend((distance, item) for item in items)
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return results
+
+    def __len__(self):
+        return self.size
+
+
+def group_similar(hashes, threshold=DEFAULT_THRESHOLD):
+    """
+    Cluster items whose hashes are within `threshold` bits of each other.
+
+    Items are added to a BK-tree one by one and each is linked to the earlier
+    items it is close to, using union-find so chains of similar images end up
+    in one group.
+
+    Args:
+        hashes (iterable): (item, hash) pairs.
+        threshold (int): Max Hamming distance for two images to match.
+
+    Returns:
+        list: Groups (lists of items) with two or more members.
+    """
+    tree = BKTree()
+    parent = {}
+
+    def find(item):
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    order = []
+    for item, value in hashes:
+        parent[item] = item
+        order.append(item)
+        for _, match in tree.query(value, threshold):
+            root_a, root_b = find(item), find(match)
+            if root_a != root_b:
+                parent[root_a] = root_b
+        tree.add(value, item)
+
+    groups = {}
+    for item in order:
+        groups.setdefault(find(item), []).append(item)
+    return [g for g in groups.values() if len(g) > 1]
@@ -0,0 +1,331 @@
+"""
+Test cases:
+- Identical files are grouped, unique files are not
+- Same-size files that differ in their head are dropped before full hashing
+- Hash index reuses digests on rescan and compacts removed files
+- Parallel hashing pool returns the same groups as the serial path
+- Other digest algorithms and block sizes give the same groups
+- Hardlinks to one inode are scanned once and never reported as duplicates
+- Byte verification keeps identical files and splits groups that differ
+- Large groups verify in bounded batches and unreadable files drop out alone
+- Hardlink plans keep the oldest copy, report reclaimed bytes and honour dry runs
+- Plans keep a copy that already has hardlinks, so a rescan finds no groups
+- Plan actions refuse files edited after planning and keep foreign temp files
+- The streaming generator yields the same groups one bucket at a time
+- The compact file table interns directories and finds size collisions
+- BK-tree radius queries and near-duplicate grouping chain similar hashes
+- Perceptual hashes match a resized copy but not an unrelated image, and
+  near-duplicate groups cannot be planned
+- Images over Pillow's pixel limit are skipped instead of aborting the scan
+"""
+import os
+import sys
+import shutil
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(__file__), "..", "scripts", "system_utilities", "DuplicateFileFinder"),
+)
+
+from duplicate_finder import (  # noqa: E402
+    find_duplicates,
+    find_similar_images,
+    iter_duplicates,
+    new_stage_stats,
+    verify_duplicates,
+    verify_group,
+)
+from dedup_actions import build_plan, execute_plan, read_plan, write_plan  # noqa: E402
+import file_table  # noqa: E402
+from file_table import FileTable  # noqa: E402
+from hash_index import HashIndex  # noqa: E402
+from hash_pool import HashingPool  # noqa: E402
+from near_duplicates import (  # noqa: E402
+    DEFAULT_THRESHOLD,
+    HASH_FUNCTIONS,
+    BKTree,
+    Image,
+    group_similar,
+    hamming_distance,
+    image_hash,
+)
+
+
+TEST_DIR = "test_duplicates"
+INDEX_FILE = "test_duplicates.idx"
+
+
+def write(name, data):
+    path = os.path.join(TEST_DIR, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def setup_module():
+    """
+    Create a directory with two duplicate groups and a few unique files
+    """
+    write("a.bin", b"x" * 5000)
+    write("sub/b.bin", b"x" * 5000)
+    write("c.bin", b"y" * 5000)
+    write("d.txt", b"hello")
+    write("e.txt", b"hello")
+    write("unique.txt", b"only one of me")
+    write("video1.mp4", b"A" + b"v" * 100000)
+    write("video2.mp4", b"B" + b"v" * 100000)
+
+
+def teardown_module():
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+    if os.path.exists(INDEX_FILE):
+        os.remove(INDEX_FILE)
+
+
+def group_sets(duplicates):
+    return sorted(sorted(os.path.basename(p) for p in paths) for paths in duplicates.values())
+
+
+def test_find_duplicates_groups():
+    duplicates = find_duplicates(TEST_DIR)
+    assert group_sets(duplicates) == [["a.bin", "b.bin"], ["d.txt", "e.txt"]]
+
+
+def test_partial_hash_stage_eliminates_different_heads():
+    stats = new_stage_stats()
+    duplicates = find_duplicates(TEST_DIR, stats=stats)
+    assert all("video1.mp4" not in p for paths in duplicates.values() for p in paths)
+    assert stats["eliminated_by_size"] == 1
+    assert stats["eliminated_by_partial"] == 2
+    assert stats["fully_hashed"] == 5
+    assert stats["bytes_avoided"] > 0
+
+
+def test_hash_index_rescan_and_compact():
+    with HashIndex(INDEX_FILE) as index:
+        first = find_duplicates(TEST_DIR, index=index)
+        assert index.hits == 0
+
+    with HashIndex(INDEX_FILE) as index:
+        second = find_duplicates(TEST_DIR, index=index)
+        assert index.misses == 0
+        assert group_sets(first) == group_sets(second)
+
+        entries = len(index)
+        os.remove(os.path.join(TEST_DIR, "c.bin"))
+        assert index.compact() == 1
+        assert len(index) == entries - 1
+
+
+def test_parallel_pool_matches_serial():
+    serial = find_duplicates(TEST_DIR)
+    for use_processes in (False, True):
+        with HashingPool(workers=4, use_processes=use_processes, per_device=2, max_in_flight=3) as pool:
+            assert find_duplicates(TEST_DIR, pool=pool) == serial
+            # The executor is started once and reused across runs
+            executor = pool._executor
+            assert find_duplicates(TEST_DIR, pool=pool) == serial
+            assert pool._executor is executor
+        assert pool._executor is None
+
+
+def test_alternative_algorithms_find_same_groups():
+    expected = group_sets(find_duplicates(TEST_DIR))
+    for algorithm in ("sha1", "sha256", "blake2b"):
+        duplicates = find_duplicates(TEST_DIR, algorithm=algorithm, block_size=1024)
+        assert group_sets(duplicates) == expected
+
+
+def test_hardlinks_are_collapsed():
+    os.link(os.path.join(TEST_DIR, "unique.txt"), os.path.join(TEST_DIR, "unique_link.txt"))
+    try:
+        stats = new_stage_stats()
+        duplicates = find_duplicates(TEST_DIR, stats=stats)
+        assert stats["hardlinks_collapsed"] == 1
+        assert all("unique" not in os.path.basename(p) for paths in duplicates.values() for p in paths)
+    finally:
+        os.remove(os.path.join(TEST_DIR, "unique_link.txt"))
+
+
+def test_verify_splits_groups_that_differ():
+    same1 = write("verify/same1.bin", b"z" * 3000 + b"1")
+    same2 = write("verify/same2.bin", b"z" * 3000 + b"1")
+    other = write("verify/other.bin", b"z" * 3000 + b"2")
+    try:
+        assert verify_group([same1, other, same2], chunk_size=1024) == [[same1, same2]]
+
+        stats = new_stage_stats()
+        verified = verify_duplicates({"fake": [same1, same2, other]}, stats)
+        assert list(verified.values()) == [[same1, same2]]
+        assert stats["verification_splits"] == 1
+
+        assert group_sets(find_duplicates(TEST_DIR, verify=True)) == group_sets(find_duplicates(TEST_DIR))
+    finally:
+        shutil.rmtree(os.path.join(TEST_DIR, "verify"), ignore_errors=True)
+
+
+def test_verify_group_batches_and_skips_unreadable_files():
+    paths = [write(f"batch/{i}.bin", b"q" * 2000 + (b"1" if i % 3 else b"2")) for i in range(9)]
+    missing = os.path.join(TEST_DIR, "batch", "missing.bin")
+    try:
+        expected = sorted(sorted(g) for g in verify_group(paths))
+        assert expected == sorted([sorted(p for i, p in enumerate(paths) if i % 3),
+                                   sorted(p for i, p in enumerate(paths) if not i % 3)])
+        for max_open in (2, 3, 4):
+            batched = verify_group(paths + [missing], chunk_size=512, max_open=max_open)
+            assert sorted(sorted(g) for g in batched) == expected
+    finally:
+        shutil.rmtree(os.path.join(TEST_DIR, "batch"), ignore_errors=True)
+
+
+def test_plan_and_execute_hardlinks():
+    first = write("plan/old.bin", b"p" * 2048)
+    second = write("plan/newer/copy.bin", b"p" * 2048)
+    os.utime(first, (1000, 1000))
+    plan_file = os.path.join(TEST_DIR, "plan.jsonl")
+    try:
+        duplicates = find_duplicates(os.path.join(TEST_DIR, "plan"))
+        assert write_plan(build_plan(duplicates, action="hardlink", keep="oldest"), plan_file) == 1
+
+        summary = execute_plan(read_plan(plan_file), dry_run=True)
+        assert summary == {"applied": 1, "failed": 0, "bytes_reclaimed": 2048}
+        assert os.stat(first).st_ino != os.stat(second).st_ino
+
+        summary = execute_plan(read_plan(plan_file))
+        assert summary["bytes_reclaimed"] == 2048
+        assert os.stat(first).st_ino == os.stat(second).st_ino
+    finally:
+        shutil.rmtree(os.path.join(TEST_DIR, "plan"), ignore_errors=True)
+        os.remove(plan_file)
+
+
+def test_plan_keeps_hardlinked_copy():
+    first = write("plan/a.bin", b"h" * 2048)
+    linked = os.path.join(TEST_DIR, "plan", "b.bin")
+    os.link(first, linked)
+    copy = write("plan/c.bin", b"h" * 2048)
+    os.utime(copy, (1000, 1000))
+    try:
+        duplicates = find_duplicates(os.path.join(TEST_DIR, "plan"))
+        plan = list(build_plan(duplicates, action="hardlink", keep="oldest"))
+        assert [item["target"] for item in plan] == [copy]
+
+        assert execute_plan(plan)["bytes_reclaimed"] == 2048
+        assert find_duplicates(os.path.join(TEST_DIR, "plan")) == {}
+    finally:
+        shutil.rmtree(os.path.join(TEST_DIR, "plan"), ignore_errors=True)
+
+
+def test_plan_refuses_changed_files():
+    first = write("plan/old.bin", b"p" * 2048)
+    second = write("plan/copy.bin", b"p" * 2048)
+    os.utime(first, (1000, 1000))
+    try:
+        [item] = build_plan(find_duplicates(os.path.join(TEST_DIR, "plan")), action="delete")
+        # Same size, same mtime, different bytes: only the byte compare catches it
+        with open(second, "r+b") as f:
+            f.write(b"q")
+        os.utime(second, ns=(item["mtime_ns"], item["mtime_ns"]))
+        assert execute_plan([item])["failed"] == 1
+        assert os.path.exists(second)
+
+        os.utime(second, (2000, 2000))
+        assert execute_plan([item])["failed"] == 1
+
+        write("plan/copy.bin", b"p" * 2048)
+        [item] = build_plan(find_duplicates(os.path.join(TEST_DIR, "plan")), action="hardlink")
+        tmp = write("plan/copy.bin.dedup-tmp", b"not mine")
+        assert execute_plan([item])["failed"] == 1
+        with open(tmp, "rb") as f:
+            assert f.read() == b"not mine"
+    finally:
+        shutil.rmtree(os.path.join(TEST_DIR, "plan"), ignore_errors=True)
+
+
+def test_iter_duplicates_streams_same_groups():
+    groups = iter_duplicates(TEST_DIR, batch_files=1)
+    first_digest, first_paths = next(groups)
+    streamed = {first_digest: first_paths, **dict(groups)}
+    assert streamed == find_duplicates(TEST_DIR)
+
+
+def test_file_table_size_collisions(monkeypatch):
+    table = FileTable()
+    table.add("/data/a", "one.bin", 10, 1, 100, 5)
+    table.add("/data/b", "two.bin", 20, 1, 101, 5)
+    table.add("/data/a", "three.bin", 10, 1, 102, 6)
+    assert len(table) == 3
+    assert table.dirs == ["/data/a", "/data/b"]
+    assert list(table.iter_size_collisions()) == [
+        (10, [("/data/a/one.bin", (1, 100, 10, 5)), ("/data/a/three.bin", (1, 102, 10, 6))]),
+    ]
+
+    # Sorted runs merge into the same collisions as a single sort
+    for i in range(20):
+        table.add("/data/c", f"{i}.bin", i % 7, 1, 200 + i, 5)
+    expected = list(table.iter_size_collisions())
+    monkeypatch.setattr(file_table, "SORT_RUN", 3)
+    assert list(table.iter_size_collisions()) == expected
+    assert [size for size, _ in expected] == [0, 1, 2, 3, 4, 5, 6, 10]
+
+
+def test_bk_tree_radius_query_and_grouping():
+    tree = BKTree()
+    for value, item in [(0b0000, "a"), (0b0001, "b"), (0b0111, "c"), (0b1111_0000, "d")]:
+        tree.add(value, item)
+    assert len(tree) == 4
+    assert sorted(item for _, item in tree.query(0b0000, 1)) == ["a", "b"]
+    assert sorted(tree.query(0b0011, 1)) == [(1, "b"), (1, "c")]
+
+    groups = group_similar([("a", 0b0000), ("b", 0b0001), ("c", 0b0011), ("d", 0b1111_0000)], threshold=1)
+    assert groups == [["a", "b", "c"]]
+
+
+def test_perceptual_hashes_match_resized_copies():
+    import pytest
+
+    if Image is None:
+        pytest.skip("Pillow is not installed")
+    directory = os.path.join(TEST_DIR, "images")
+    os.makedirs(directory, exist_ok=True)
+    try:
+        photo = Image.new("RGB", (256, 192))
+        photo.putdata([(x, (x * y) % 256, y) for y in range(192) for x in range(256)])
+        photo.save(os.path.join(directory, "photo.png"))
+        photo.resize((128, 96)).save(os.path.join(directory, "photo_small.jpg"), quality=80)
+        os.link(os.path.join(directory, "photo.png"), os.path.join(directory, "photo_link.png"))
+        other = Image.new("RGB", (256, 192))
+        other.putdata([(255 * ((x // 32 + y // 32) % 2),) * 3 for y in range(192) for x in range(256)])
+        other.save(os.path.join(directory, "checkers.png"))
+
+        for name, func in HASH_FUNCTIONS.items():
+            original = func(os.path.join(directory, "photo.png"))
+            resized = func(os.path.join(directory, "photo_small.jpg"))
+            unrelated = func(os.path.join(directory, "checkers.png"))
+            assert hamming_distance(original, resized) <= DEFAULT_THRESHOLD, name
+            assert hamming_distance(original, unrelated) > DEFAULT_THRESHOLD, name
+
+        groups = find_similar_images(directory)
+        assert [sorted(os.path.basename(p) for p in g) for g in groups.values()] in (
+            [["photo.png", "photo_small.jpg"]], [["photo_link.png", "photo_small.jpg"]])
+        with pytest.raises(ValueError):
+            list(build_plan(groups))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_decompression_bombs_are_skipped():
+    import pytest
+
+    if Image is None:
+        pytest.skip("Pillow is not installed")
+    path = os.path.join(TEST_DIR, "bomb.png")
+    Image.new("L", (64, 64)).save(path)
+    limit = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = 64 * 64 // 3
+    try:
+        assert image_hash(path) is None
+    finally:
+        Image.MAX_IMAGE_PIXELS = limit
+        os.remove(path)
@@ -0,0 +1,559 @@
+"""
+Test cases:
+- Serial and concurrent engines return the same results for a local server
+- Concurrent engine overlaps slow requests instead of running them in turn
+- Checks against one host reuse a single keep-alive connection
+- Monitor scheduler checks each target on its own interval, honours an early stop
+  and can run again after stopping
+- Phase timings split the response time and are zero on reused connections
+- Probe mode reads no body after HEAD and falls back to a capped GET;
+  a malformed Content-Length is treated as unknown
+- DNS cache honors TTLs and coalesces concurrent lookups of one host;
+  coalesced callers share a failed lookup's error instead of a stale answer,
+  and /etc/hosts names are recognised for the system resolver
+- Streaming writers flush in batches and the history file rotates
+- Latency histogram percentiles stay within 2% and merge across workers
+- Sharded checking keeps each host in one process, merges worker totals and
+  ends with the input's error instead of hanging; a dead worker's URLs are
+  dropped without blocking the other shards
+- Cached validators turn repeat checks into 304s counted as UP
+- Retries back off, and a tripped circuit fails fast until its half-open probe
+- Stand-in server honors its drop, status and size knobs
+- Metrics endpoint serves per-URL gauges, counters and latency histograms
+- Streamed URL input is deduplicated and read only a bounded window ahead;
+  the Bloom filter grows past its capacity, skipped duplicates are counted,
+  undecodable bytes are replaced and a slow source does not block results
+- State store writes only transitions, rolls up latency, reopens from disk
+  and counts only observed time towards uptime
+"""
+import contextlib
+import io
+import os
+import socket
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts", "networking_web"))
+
+from url_health.resolver import DNSCache, hosts_file_names  # noqa: E402
+from url_health.scheduler import CheckScheduler, MonitorTarget  # noqa: E402
+from web_url_health_checker import (  # noqa: E402
+    URLHealthChecker,
+    _declared_length,
+    parse_monitor_targets,
+    print_uptime,
+)
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves /ok, /missing (404) and /slow (0.3 s delay) with keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path.startswith("/slow"):
+            time.sleep(0.3)
+        status = 404 if self.path.startswith("/missing") else 200
+        body = b"hello"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+server = None
+BASE = None
+
+
+def setup_module():
+    global server, BASE
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    BASE = f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def teardown_module():
+    server.shutdown()
+    server.server_close()
+
+
+def summarize(results):
+    return [(r["url"], r["status"], r["status_code"], r["error"]) for r in results]
+
+
+def test_concurrent_matches_serial():
+    urls = [f"{BASE}/ok", f"{BASE}/missing", f"{BASE}/ok?2"]
+    serial = URLHealthChecker(timeout=5).check_urls(urls)
+    concurrent = URLHealthChecker(timeout=5).check_urls_concurrent(urls, concurrency=4)
+    assert summarize(concurrent) == summarize(serial)
+    assert summarize(serial)[1] == (f"{BASE}/missing", "DOWN", 404, "HTTP 404")
+    assert set(serial[0]) == set(concurrent[0])
+
+
+def test_concurrent_overlaps_slow_requests():
+    urls = [f"{BASE}/slow?{i}" for i in range(8)]
+    start = time.perf_counter()
+    results = URLHealthChecker(timeout=5).check_urls_concurrent(urls, concurrency=8, per_host=8)
+    elapsed = time.perf_counter() - start
+    assert all(r["status"] == "UP" for r in results)
+    assert elapsed < 8 * 0.3 / 2
+
+
+def test_session_reuses_connections():
+    checker = URLHealthChecker(timeout=5, pool_maxsize=2)
+    checker.check_urls([f"{BASE}/ok?{i}" for i in range(6)])
+    stats = checker.session.pool_adapter.stats()
+    assert stats["requests"] == 6
+    assert stats["connections_opened"] == 1
+    assert stats["reuse_ratio"] > 0.8
+
+
+def test_scheduler_runs_targets_on_their_intervals():
+    counts = {"fast": 0, "slow": 0}
+    lock = threading.Lock()
+
+    def check(url):
+        with lock:
+            counts[url] += 1
+        return {"status": "UP"}
+
+    scheduler = CheckScheduler(workers=4)
+    scheduler.add(MonitorTarget("fast", interval=0.05), first_due=scheduler.clock())
+    scheduler.add(MonitorTarget("slow", interval=10), first_due=scheduler.clock())
+    scheduler.run(check, duration=0.5)
+
+    assert counts["slow"] == 1
+    assert 5 <= counts["fast"] <= 11
+    assert scheduler.stats()["dispatched"] == counts["fast"] + counts["slow"]
+
+    # A stop() issued before run() is not lost
+    early = CheckScheduler(workers=1)
+    early.add(MonitorTarget("fast", interval=0.05), first_due=early.clock())
+    early.stop()
+    started = time.monotonic()
+    early.run(check, duration=5)
+    assert time.monotonic() - started < 1
+    assert early.stats()["dispatched"] == 0
+
+    # The stop ended that run only; the next run dispatches again
+    early.run(check, duration=0.2)
+    assert early.stats()["dispatched"] >= 1
+
+
+def test_parse_monitor_targets():
+    targets = parse_monitor_targets(["https://a.com", "https://b.com 30 2"], 60, 5)
+    assert [(t.url, t.interval, t.jitter) for t in targets] == [
+        ("https://a.com", 60, 5),
+        ("https://b.com", 30.0, 2.0),
+    ]
+
+
+def test_check_url_reports_phase_timings():
+    checker = URLHealthChecker(timeout=5)
+    first = checker.check_url(f"{BASE}/slow?phases")
+    second = checker.check_url(f"{BASE}/ok?phases")
+
+    assert first["connect_time"] > 0
+    assert first["tls_time"] == 0
+    assert first["ttfb_time"] >= 250
+    phases = ("dns_time", "connect_time", "tls_time", "ttfb_time", "transfer_time")
+    assert sum(first[p] for p in phases) <= first["response_time"] + 1
+    # The second check reuses the pooled connection
+    assert second["dns_time"] == second["connect_time"] == 0
+
+
+def test_probe_mode_caps_body_bytes():
+    from url_health.standin import StandInServer
+
+    with StandInServer(size=100000) as standin:
+        full = URLHealthChecker(timeout=5).check_url(standin.url("/big"))
+        probe = URLHealthChecker(timeout=5, probe=True, max_body_bytes=64)
+        head = probe.check_url(standin.url("/big"))
+        # Servers that reject HEAD get a streamed GET capped at max_body_bytes
+        fallback = probe.check_url(f"{BASE}/ok")
+
+    assert full["bytes_received"] == 100000
+    assert head["status"] == "UP" and head["bytes_received"] == 0
+    assert _declared_length("12") == 12
+    assert _declared_length("12, 12") is None and _declared_length(None) is None
+    assert fallback["status"] == "UP" and fallback["bytes_received"] == 5
+
+
+def test_dns_cache_honors_ttl_and_coalesces_lookups(tmp_path):
+    now = [0.0]
+    lookups = []
+
+    def lookup(host):
+        lookups.append(host)
+        time.sleep(0.1)
+        return ["10.0.0.1"], 30.0
+
+    cache = DNSCache(lookup=lookup, clock=lambda: now[0])
+    threads = [threading.Thread(target=cache.resolve, args=("example.com",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert lookups == ["example.com"]
+
+    now[0] = 29.0
+    assert cache.resolve("example.com") == ["10.0.0.1"]
+    now[0] = 31.0
+    cache.resolve("example.com")
+    assert len(lookups) == 2
+    assert cache.resolve("127.0.0.1") == ["127.0.0.1"]
+
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (2, 7, 1)
+
+    def failing(host):
+        time.sleep(0.1)
+        raise socket.gaierror("lookup failed")
+
+    cache.lookup = failing
+    now[0] = 100.0
+    outcomes = []
+
+    def resolve():
+        try:
+            outcomes.append(cache.resolve("example.com"))
+        except socket.gaierror:
+            outcomes.append("error")
+
+    threads = [threading.Thread(target=resolve) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert outcomes == ["error"] * 4
+
+    hosts = tmp_path / "hosts"
+    hosts.write_text("127.0.0.1 localhost Box.lan  # comment names-ignored\n# ::1 commented\n")
+    assert hosts_file_names(str(hosts)) == {"localhost", "box.lan"}
+
+
+def test_streaming_writers_and_history_rotation(tmp_path):
+    import json
+    from url_health.output import CSVWriter, HistoryWriter, JSONLWriter
+
+    checker = URLHealthChecker(timeout=5, keep_results=False)
+    jsonl = JSONLWriter(str(tmp_path / "report.jsonl"), batch_size=2)
+    history = HistoryWriter(str(tmp_path / "history.jsonl"), max_bytes=1, backups=2, batch_size=1)
+    checker.add_writer(jsonl)
+    checker.add_writer(CSVWriter(str(tmp_path / "report.csv")))
+    checker.add_writer(history)
+
+    checker.check_urls([f"{BASE}/ok", f"{BASE}/missing", f"{BASE}/ok?2"])
+    # Two results form a full batch and are already on disk mid-run
+    assert len((tmp_path / "report.jsonl").read_text().splitlines()) == 2
+    checker.close_writers()
+
+    rows = [json.loads(line) for line in (tmp_path / "report.jsonl").read_text().splitlines()]
+    assert [r["status"] for r in rows] == ["UP", "DOWN", "UP"]
+    assert len((tmp_path / "report.csv").read_text().splitlines()) == 4
+    assert checker.results == []
+    assert (checker.totals["checked"], checker.totals["up"]) == (3, 2)
+    # Every flush crossed max_bytes: the two newest results survive in backups
+    assert not (tmp_path / "history.jsonl").read_text()
+    assert json.loads((tmp_path / "history.jsonl.1").read_text())["url"] == f"{BASE}/ok?2"
+    assert (tmp_path / "history.jsonl.2").exists() and not (tmp_path / "history.jsonl.3").exists()
+
+
+def test_latency_histogram_percentiles_and_merge():
+    import random
+    from url_health.stats import LatencyHistogram, LatencyStats
+
+    rng = random.Random(1)
+    samples = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    left, right = LatencyHistogram(), LatencyHistogram()
+    for i, value in enumerate(samples):
+        (left if i % 2 else right).record(value)
+    merged = LatencyHistogram.from_dict(left.to_dict()).merge(right)
+
+    ordered = sorted(samples)
+    for p in (50, 90, 99, 99.9):
+        exact = ordered[max(int(p / 100 * len(ordered) + 0.5) - 1, 0)]
+        assert abs(merged.percentile(p) - exact) <= 0.02 * exact
+    assert merged.count == len(samples)
+    assert len(merged.buckets) < 1000
+
+    stats = LatencyStats()
+    stats.record("a.com", 10)
+    other = LatencyStats()
+    other.record("a.com", 30)
+    other.record("b.com", 5)
+    stats.merge(LatencyStats.from_dict(other.to_dict()))
+    assert stats.hosts["a.com"].count == 2 and stats.overall.count == 3
+
+
+def test_sharded_check_keeps_hosts_together_and_merges_totals():
+    from queue import Queue
+    from url_health.shard import shard_of
+    from web_url_health_checker import host_of
+
+    # The feeder routes every URL of a host to the inbox of shard_of(host)
+    checker = URLHealthChecker(timeout=5)
+    checker.SHARD_BATCH = 3
+    urls = [f"http://host{i % 5}.test/{i}" for i in range(50)]
+    inboxes = [Queue() for _ in range(3)]
+    checker._feed_shards(urls, inboxes)
+    for shard, inbox in enumerate(inboxes):
+        batches = list(iter(inbox.get, None))
+        assert inbox.empty()
+        assert sum(batches, []) == [url for url in urls if shard_of(host_of(url), 3) == shard]
+
+    local = BASE.replace("127.0.0.1", "localhost")
+    urls = [f"{BASE}/ok?{i}" for i in range(6)] + [f"{local}/missing", f"{local}/ok"]
+    checker = URLHealthChecker(timeout=5)
+    results = checker.check_urls_sharded(urls, processes=2, concurrency=4)
+    assert sorted(summarize(results)) == sorted(summarize(URLHealthChecker(timeout=5).check_urls(urls)))
+    assert (checker.totals["checked"], checker.totals["up"]) == (8, 7)
+    assert checker.latency.overall.count == 8 and len(checker.latency.hosts) == 2
+    assert checker.worker_counts["requests"] == 8
+
+    # A failing URL source ends the run with its error instead of hanging
+    def failing():
+        yield f"{BASE}/ok?before"
+        raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+    checker = URLHealthChecker(timeout=5)
+    try:
+        checker.check_urls_sharded(failing(), processes=2, concurrency=2)
+    except UnicodeDecodeError:
+        pass
+    else:
+        raise AssertionError("the input error was not raised")
+    assert checker.totals["checked"] == 1
+
+    # A dead worker stops draining its inbox: its URLs are dropped instead of
+    # blocking the feeder, and the live shard still gets every URL and its end
+    class Worker:
+        def __init__(self, alive):
+            self.alive = alive
+
+        def is_alive(self):
+            return self.alive
+
+    checker = URLHealthChecker(timeout=5)
+    checker.SHARD_BATCH, checker.SHARD_PUT_TIMEOUT = 1, 0.01
+    inboxes = [Queue(maxsize=1), Queue(maxsize=1)]
+    received = []
+
+    def drain():
+        for batch in iter(inboxes[1].get, None):
+            received.extend(batch)
+
+    drainer = threading.Thread(target=drain)
+    drainer.start()
+    urls = [f"http://host{i % 5}.test/{i}" for i in range(20)]
+    checker._feed_shards(urls, inboxes, [Worker(False), Worker(True)])
+    drainer.join(timeout=5)
+    live = [url for url in urls if shard_of(host_of(url), 2) == 1]
+    assert received == live
+    assert checker._feed_dropped == len(urls) - len(live) - 1
+
+
+def test_conditional_requests_count_304_as_up(tmp_path):
+    from url_health.standin import StandInServer
+
+    cache_file = str(tmp_path / "validators.json")
+    with StandInServer(size=2048) as standin:
+        first = URLHealthChecker(timeout=5, cache_file=cache_file)
+        assert first.check_url(standin.url("/page"))["bytes_received"] == 2048
+        first.save_cache()
+
+        second = URLHealthChecker(timeout=5, cache_file=cache_file)
+        second.check_urls([standin.url("/page")])
+
+    result = second.results[0]
+    assert (result["status"], result["status_code"], result["bytes_received"]) == ("UP", 304, 0)
+    assert second.totals["not_modified"] == 1
+    assert second.not_modified_latency.count == 1 and second.latency.overall.count == 0
+
+
+def test_circuit_breaker_fails_fast_and_probes_when_half_open():
+    from url_health.breaker import CircuitBreaker
+
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    for _ in range(2):
+        assert breaker.allow("h")
+        breaker.record("h", success=False)
+    assert not breaker.allow("h") and breaker.allow("other")
+    now[0] = 10.0
+    assert breaker.allow("h") and not breaker.allow("h")  # one half-open probe only
+    breaker.record("h", success=True)
+    assert breaker.allow("h") and breaker.allow("h")
+    assert breaker.stats() == {"trips": 1, "rejected": 2}
+
+    # A refused port: each URL retries once, then the host's circuit opens
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        dead = f"http://127.0.0.1:{sock.getsockname()[1]}"
+    checker = URLHealthChecker(timeout=5, retries=1, backoff=0.01, breaker_threshold=4)
+    results = checker.check_urls([f"{dead}/{i}" for i in range(5)])
+    assert [r["attempts"] for r in results] == [2, 2, 0, 0, 0]
+    assert results[-1]["error"].startswith("Circuit open")
+    assert checker.totals["retries"] == 2
+    assert checker.breaker.stats()["rejected"] == 3
+
+
+def test_standin_server_knobs():
+    from url_health.standin import StandInServer
+
+    with StandInServer(drop=1.0) as standin:
+        dropped = URLHealthChecker(timeout=5).check_url(standin.url("/"))
+        served = URLHealthChecker(timeout=5).check_url(standin.url("/?drop=0&status=503&size=7"))
+        assert standin.requests_dropped == 1 and standin.requests_served == 1
+
+    assert dropped["error"] == "Connection error"
+    assert (served["status_code"], served["bytes_received"]) == (503, 7)
+
+
+def test_metrics_endpoint_exposes_gauges_and_histograms():
+    import urllib.request
+    from url_health.metrics import MetricsServer
+
+    checker = URLHealthChecker(timeout=5)
+    registry = checker.enable_metrics()
+    checker.check_urls([f"{BASE}/ok", f"{BASE}/missing", f"{BASE}/ok"])
+
+    with MetricsServer(registry, port=0) as metrics:
+        text = urllib.request.urlopen(metrics.url, timeout=5).read().decode()
+
+    host = BASE.split("//")[1]
+    assert f'url_health_up{{url="{BASE}/ok"}} 1' in text
+    assert f'url_health_up{{url="{BASE}/missing"}} 0' in text
+    assert f'url_health_checks_total{{host="{host}",status="up"}} 2' in text
+    assert f'url_health_response_seconds_bucket{{host="{host}",le="+Inf"}} 3' in text
+    assert "url_health_checks_in_flight 0" in text
+
+
+def test_streamed_urls_are_deduped_and_read_lazily(tmp_path):
+    from url_health.ingest import (BloomFilter, ScalableBloomFilter, canonical_url, dedupe_urls,
+                                   iter_url_lines)
+
+    export = tmp_path / "urls.txt"
+    export.write_bytes(b"https://a.test/\n# comment\nhttps://b.test/\xff\n\nhttps://c.test/\n")
+    assert list(iter_url_lines(str(export))) == ["https://a.test/", "https://b.test/\ufffd", "https://c.test/"]
+
+    assert canonical_url("Example.com") == canonical_url("https://example.com:443/#top")
+    assert canonical_url("http://example.com:8080/a") != canonical_url("http://example.com/a")
+
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    added = sum(bloom.add(f"url-{i}") for i in range(10000))
+    assert added >= 9900 and all(f"url-{i}" in bloom for i in range(10000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+    # Past its capacity the scalable filter adds slices instead of dropping URLs
+    scalable = ScalableBloomFilter(capacity=1000, error_rate=0.01)
+    added = sum(scalable.add(f"url-{i}") for i in range(20000))
+    assert added >= 19800 and len(scalable.slices) > 1
+    assert sum(f"other-{i}" in scalable for i in range(10000)) < 100
+
+    pulled = []
+
+    def source():
+        for i in range(40):
+            pulled.append(i)
+            yield f"{BASE}/ok?{i % 20}"
+
+    counts = {}
+    urls = dedupe_urls(source(), "bloom", capacity=1000, counts=counts)
+    checker = URLHealthChecker(timeout=5)
+    results = checker.check_urls_concurrent(urls, concurrency=2, per_host=2)
+    assert [r["url"] for r in results] == [f"{BASE}/ok?{i}" for i in range(20)]
+    assert len(pulled) == 40
+    assert counts == {"unique": 20, "duplicates": 20}
+
+    # The engine reads only a bounded window ahead of the checks in flight
+    seen_when_checked = []
+    lazy = (pulled.append(i) or f"{BASE}/ok?lazy{i}" for i in range(100))
+    pulled.clear()
+    original = checker.check_url
+    checker.check_url = lambda url: seen_when_checked.append(len(pulled)) or original(url)
+    checker.check_urls_concurrent(lazy, concurrency=2)
+    assert seen_when_checked[0] <= 2 * URLHealthChecker.PENDING_PER_SLOT + 1
+
+    # A slow source does not hold up recording checks that already finished
+    recorded = []
+    resumed = []
+
+    def slow_source():
+        yield f"{BASE}/ok?first"
+        time.sleep(0.5)
+        resumed.append(time.monotonic())
+        yield f"{BASE}/ok?second"
+
+    checker = URLHealthChecker(timeout=5)
+    original_record = checker._record
+    checker._record = lambda result, account=True: (recorded.append(time.monotonic())
+                                                    or original_record(result, account))
+    checker.check_urls_concurrent(slow_source(), concurrency=2)
+    assert len(recorded) == 2 and recorded[0] < resumed[0]
+
+
+def test_state_store_records_transitions_and_rollups(tmp_path):
+    from url_health.history import StateStore
+
+    now = [0.0]
+    store = StateStore(str(tmp_path), rollup_seconds=600, flush_seconds=3600, clock=lambda: now[0])
+    url, other = "https://example.com", "https://other.example"
+    changed = []
+    # UP for 35 minutes, DOWN for 10, then UP again, one check a minute;
+    # another URL's records are interleaved with these
+    for minute in range(60):
+        now[0] = minute * 60.0
+        status = "DOWN" if 35 <= minute < 45 else "UP"
+        result = {"url": url, "status": status,
+                  "response_time": None if status == "DOWN" else 10.0 + minute % 3}
+        changed.append(store.record(result))
+        store.record({"url": other, "status": "DOWN" if minute % 2 else "UP", "response_time": 1.0})
+    assert [i for i, c in enumerate(changed) if c] == [0, 35, 45]
+    store.close()
+    assert store.transitions.rows == 3 + 60
+    assert store.rollup_table.rows == 12
+    assert os.path.getsize(tmp_path / "transitions.dat") == 63 * store.transitions.record.size
+
+    reopened = StateStore(str(tmp_path), rollup_seconds=600, clock=lambda: now[0])
+    assert reopened.urls == [url, other]
+    report = reopened.uptime(url, since=0, until=3600)
+    assert report["transitions"] == 3
+    # Observed from the first check to the last one, not to the end of the window
+    assert report["observed_seconds"] == 3540
+    assert report["down_seconds"] == 600
+    assert abs(report["uptime"] - 2940 / 3540) < 1e-9
+    assert reopened.uptime("https://unknown.example", since=0) is None
+    assert reopened.uptime(other, since=0, until=3600)["transitions"] == 60
+
+    # A later run after a silence longer than a rollup period: the gap is not observed
+    now[0] = 7200.0
+    assert not reopened.record({"url": url, "status": "UP", "response_time": 10.0})
+    now[0] = 7260.0
+    reopened.record({"url": url, "status": "UP", "response_time": 10.0})
+    report = reopened.uptime(url, since=0, until=7300)
+    assert report["observed_seconds"] == 3540 + 60
+    assert abs(report["uptime"] - 3000 / 3600) < 1e-9
+    assert reopened.uptime(url, since=3600, until=7300)["observed_seconds"] == 60
+    reopened.close()
+
+    reopened = StateStore(str(tmp_path), rollup_seconds=600, clock=lambda: now[0])
+    periods = reopened.rollups(url, since=0, until=3600)
+    assert [p["start"] for p in periods] == [0, 600, 1200, 1800, 2400, 3000]
+    assert [p["up"] for p in periods] == [10, 10, 10, 5, 5, 10]
+    assert abs(periods[3]["mean_latency"] - 10.8) < 1e-9
+    assert periods[0]["min_latency"] == 10.0 and periods[0]["max_latency"] == 12.0
+
+    # The overall mean weighs periods by checks that got a response
+    latencies = [10.0 + minute % 3 for minute in range(60) if not 35 <= minute < 45] + [10.0, 10.0]
+    report = io.StringIO()
+    with contextlib.redirect_stdout(report):
+        print_uptime(reopened, url, days=1)
+    assert f"mean {sum(latencies) / len(latencies):.2f}ms" in report.getvalue()